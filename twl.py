@@ -4,10 +4,16 @@ for use in word games.
 
 Functionality:
 
-- Check if a word is in the dictionary.
-- Enumerate all words in the dictionary.
-- Determine what letters may appear after a given prefix.
+- Check if a word, or a whole batch of words, is in the dictionary.
+- Enumerate all words in the dictionary, only those of a given length,
+  or all of them grouped by length in one pass.
+- Determine what letters may appear after a given prefix, or extend a
+  prefix one letter at a time with a cursor.
 - Determine what words can be formed by anagramming a set of letters.
+- Count the words with a given prefix, and map words to and from their
+  alphabetical index.
+- Find or count the words matching a pattern of allowed letters per position.
+- Find the words consistent with the clues of a Wordle game.
 
 Sample usage:
 
@@ -34,8 +40,13 @@ disk but also once loaded into RAM. In fact, this is the primary
 benefit of this method over others - it is optimized for low memory
 usage (not speed).
 
+Other word lists can be compiled into the same format with twl_build and
+loaded with configure(dictionary=...).
+
 The data is stored in the Python module as a base-64 encoded, 
-zlib-compressed string.
+zlib-compressed string. It is decoded on first use rather than at import
+time, so importing the module is cheap. The decoded table can also be
+cached on disk and memory-mapped, see configure().
 
 Each record of the DAWG table is packed into a 32-bit integer.
 
@@ -45,8 +56,10 @@ M - More Flag
 L - ASCII Letter (lowercase or '$')
 I - Index (Pointer)
 
-The helper method _get_record(index) will extract these three elements 
-into a Python tuple such as (True, 'a', 26). 
+The decompressed table is viewed as an array of unsigned 32-bit integers
+(see _record_table), so traversals read records in place without
+allocating. The helper method _get_record(index) will extract these three
+elements into a Python tuple such as (True, 'a', 26). 
 
 All searches start at index 0 in the lookup table. Records are scanned 
 sequentially as long as the More flag is set. These records represent all 
@@ -109,6 +122,10 @@ found. If this value is found, the string is a word in the dictionary.
 If at any point during the search the appropriate child is not found,
 the search fails - the string is not a word.
 
+Traversals that enumerate words (iteration and anagrams) run on an
+explicit stack holding the next record index of every open node, so
+each word is built and yielded once, whatever its length.
+
 See also:
 
 http://code.activestate.com/recipes/577835-self-contained-twl06-dictionary-module-500-kb/
@@ -116,10 +133,16 @@ http://en.wikipedia.org/wiki/Official_Tournament_and_Club_Word_List
 http://www.isc.ro/lists/twl06.zip
 '''
 
+import array
 import base64
-import collections
+import hashlib
 import itertools
+import mmap
+import os
 import struct
+import sys
+import tempfile
+import threading
 import zlib
 
 def check(word):
@@ -132,12 +155,43 @@ def check(word):
     >>> twl.check('asdf')
     False
     '''
-    return word in _DAWG
+    return word in _get_dawg()
+
+def words_by_length(lengths=None):
+    '''
+    Groups the words of the given `lengths` (all lengths by default) in
+    a single traversal. Returns a dict mapping each length to a bytes
+    object holding its words back to back as fixed-width ASCII records
+    in alphabetical order, so word i of length n is buffer[i*n:(i+1)*n].
+    Lengths with no words map to an empty buffer.
+    
+    >>> buffers = twl.words_by_length([4, 5])
+    >>> len(buffers[5]) // 5
+    8938
+    >>> buffers[5][:10]
+    b'aahedaalii'
+    '''
+    return _get_dawg().words_by_length(lengths)
+
+def check_many(words):
+    '''
+    Checks every word in the iterable `words` and returns a bytearray
+    aligned with the input, holding 1 for each word in the dictionary
+    and 0 otherwise. Words are visited in sorted order and each one
+    resumes from the path shared with the previous word, so the cost
+    follows the number of distinct prefixes rather than the number of
+    words.
+    
+    >>> list(twl.check_many(['dog', 'dgo', 'dogs']))
+    [1, 0, 1]
+    '''
+    return _get_dawg().check_many(words)
 
-def iterator():
+def iterator(length=None):
     '''
     Returns an iterator that will yield all words stored in the 
-    dictionary in alphabetical order.
+    dictionary in alphabetical order. If `length` is given, only
+    words with exactly that many letters are yielded.
     
     Useful if you want to use this module simply as a method of
     loading words into another type of data structure. (After 
@@ -146,101 +200,1154 @@ def iterator():
     
     >>> words = set(twl.iterator())
     >>> words = list(twl.iterator())
+    >>> words = list(twl.iterator(length=5))
     '''
-    return iter(_DAWG)
+    if length is None:
+        return iter(_get_dawg())
+    return words_of_length(length)
+
+def words_of_length(length):
+    '''
+    Yields all words with exactly `length` letters in alphabetical
+    order. Subtrees that cannot complete a word of that length are
+    skipped, so the cost follows the number of matching words rather
+    than the size of the dictionary.
+    
+    >>> len(list(twl.words_of_length(5)))
+    8938
+    '''
+    return _get_dawg().words_of_length(length)
 
 def children(prefix):
     '''
     Returns a list of letters that may appear after `prefix`.
     '''
-    return _DAWG.children(prefix)
+    return _get_dawg().children(prefix)
 
-def anagram(letters):
+def cursor(prefix=''):
+    '''
+    Returns a cursor positioned after `prefix`. A cursor holds a single
+    node index and can be extended one letter at a time, so checking a
+    word as it is typed costs one step per keystroke instead of a walk
+    from the root on every change.
+    
+    >>> c = twl.cursor()
+    >>> c.advance('d') and c.advance('o') and c.advance('g')
+    True
+    >>> c.is_word
+    True
+    >>> c.fork().advance('q')
+    False
+    >>> c.children()[:4]
+    ['$', 'b', 'c', 'd']
+    '''
+    result = _Cursor(_get_dawg())
+    for letter in prefix:
+        if not result.advance(letter):
+            break
+    return result
+
+def anagram(letters, min_len=None, max_len=None):
     '''
     Yields words that can be formed with some or all of the 
     given `letters`. `letters` may include '?' characters as
-    a wildcard.
+    a wildcard. `min_len` and `max_len` bound the length of
+    the words yielded, and branches that cannot reach a word
+    within those bounds are not explored.
+    
+    >>> list(twl.anagram('top'))
+    ['op', 'opt', 'pot', 'to', 'top']
+    >>> list(twl.anagram('top', min_len=3))
+    ['opt', 'pot', 'top']
     '''
-    for word in _DAWG.anagram(letters):
+    for word in _get_dawg().anagram(letters, min_len, max_len):
         yield word
 
+def count_anagrams(letters, min_len=None, max_len=None):
+    '''
+    Returns the number of words anagram() would yield, without
+    building them. Repeated sub-searches, which are common with
+    several '?' wildcards, are only counted once.
+    
+    >>> twl.count_anagrams('top')
+    5
+    '''
+    return _get_dawg().count_anagrams(letters, min_len, max_len)
+
+def search(length, fixed=None, forbidden=None, required=None, excluded=None):
+    '''
+    Yields, in alphabetical order, the words of `length` letters that
+    are consistent with what a Wordle game has revealed so far:
+
+    - `fixed` maps a position to the letter known to be there (green).
+    - `forbidden` maps a position to letters known not to be there.
+    - `required` maps a letter to the minimum number of times it
+      appears (yellow and green letters).
+    - `excluded` holds letters the word contains no more of (gray).
+      A letter that is also in `required` appears exactly that many
+      times; any other excluded letter does not appear at all.
+
+    The DAWG is walked directly and a prefix is abandoned as soon as it
+    breaks a constraint or leaves too few letters for the required ones.
+    
+    >>> list(twl.search(5, fixed={1: 'i'}, forbidden={0: 'h', 2: 'l', 3: 'l'},
+    ...                 required={'h': 1, 'l': 1}, excluded='ly'))
+    ['lichi', 'licht', 'light', 'lithe', 'litho', 'nihil']
+    '''
+    return _get_dawg().search(length, fixed, forbidden, required, excluded)
+
+def match(pattern):
+    '''
+    Yields, in alphabetical order, the words that match `pattern`, one
+    entry per letter of the word. Each entry is either a string of the
+    letters allowed at that position or '?' for any letter, so a plain
+    string works as a pattern too. The prefixes are first counted
+    level by level as in count_matches, then only edges that lead to
+    a match are walked, so the cost follows the number of distinct
+    prefixes plus the number of matches. Patterns with a few fixed
+    letters, such as '?o?e?', take under a millisecond, while mostly
+    wildcard ones, such as '?????', take tens of milliseconds.
+    
+    >>> list(twl.match('?o?e?'))[:3]
+    ['boded', 'bodes', 'bogey']
+    >>> list(twl.match(['bc', 'a', 't']))
+    ['bat', 'cat']
+    '''
+    return _get_dawg().match(pattern)
+
+def count_matches(pattern):
+    '''
+    Returns the number of words that match `pattern` (see match)
+    without building any of them. Each level of the walk keeps one
+    count per node rather than one entry per prefix, and the last
+    letter is read from a per-node mask of the letters that end a
+    word, so '?o?e?' takes about half a millisecond. Mostly wildcard
+    patterns still visit every node of their length, about 13ms for
+    '?????'.
+    
+    >>> twl.count_matches('?o?e?')
+    324
+    '''
+    return _get_dawg().count_matches(pattern)
+
+def count(prefix=''):
+    '''
+    Returns the number of words that start with `prefix`, counting
+    `prefix` itself if it is a word. Costs one step per letter of
+    `prefix`, using word counts stored for every node.
+    
+    >>> twl.count()
+    178691
+    >>> twl.count('dude')
+    5
+    '''
+    return _get_dawg().count(prefix)
+
+def rank(word):
+    '''
+    Returns the position of `word` in the alphabetical order used by
+    iterator(). Raises ValueError if `word` is not in the dictionary.
+    
+    >>> twl.rank('aa')
+    0
+    '''
+    return _get_dawg().rank(word)
+
+def unrank(index):
+    '''
+    Returns the word at position `index` in the alphabetical order
+    used by iterator(), the inverse of rank(). Raises IndexError if
+    `index` is out of range. Useful for uniform random sampling:
+    
+    >>> twl.unrank(0)
+    'aa'
+    >>> word = twl.unrank(random.randrange(twl.count()))
+    '''
+    return _get_dawg().unrank(index)
+
+def dictionary_digest():
+    '''
+    Returns a hex SHA-256 digest identifying the selected dictionary,
+    the embedded TWL06 table or the one set with configure(), without
+    loading it. Useful as a key for data derived from the dictionary.
+    '''
+    dictionary = _OPTIONS['dictionary']
+    if dictionary is None:
+        return _data_digest(_DATA).hex()
+    with open(dictionary, 'rb') as f:
+        return _data_digest(f.read()).hex()
+
+def memory_usage():
+    '''
+    Returns a dict mapping each table held by the loaded dictionary
+    to its size in bytes. Tables that are built on first use, such
+    as the per-node word counts, only appear once they exist.
+    
+    >>> twl.memory_usage()
+    {'records': 548256}
+    '''
+    return _get_dawg().memory_usage()
+
+# Default of the configure() options that are not given, which keep their value
+_UNSET = object()
+
+def configure(cache_dir=_UNSET, backend=_UNSET, dictionary=_UNSET):
+    '''
+    Sets how the dictionary table is loaded. Options that are not
+    given keep their current value, so calls compose. Any table that
+    is already loaded is discarded, so the next query uses the new
+    settings.
+
+    `cache_dir` names a directory where the decompressed table is
+    written once, keyed by a hash of the embedded data, and then
+    memory-mapped by every later load. Processes sharing a cache
+    directory share one page-cache copy of the table instead of
+    each decoding a private one. None disables the cache. The
+    initial value is taken from the TWL_CACHE_DIR environment
+    variable.
+
+    `backend` selects how edges are followed. 'compact' scans the
+    packed sibling records and adds nothing to the table. 'dense'
+    also builds a 27-slot transition row per node, so each step of
+    check, children, count and friends is a single lookup, at the
+    cost of several MB more memory (see memory_usage). The initial
+    value is taken from the TWL_BACKEND environment variable.
+
+    `dictionary` names a record table file written by twl_build, to be
+    memory-mapped and used instead of the embedded TWL06 table. None
+    selects TWL06. The initial value is taken from the TWL_DICTIONARY
+    environment variable.
+
+    >>> twl.configure(cache_dir='/tmp/twl')
+    >>> twl.configure(backend='dense')
+    >>> twl.configure(dictionary='answers.dawg')
+    >>> twl.configure(cache_dir=None, backend='compact', dictionary=None)
+    '''
+    global _LOADED
+    if backend is not _UNSET and backend not in _BACKENDS:
+        raise ValueError('Unknown backend %r' % backend)
+    with _LOAD_LOCK:
+        for name, value in (('cache_dir', cache_dir), ('backend', backend), ('dictionary', dictionary)):
+            if value is not _UNSET:
+                _OPTIONS[name] = value
+        _LOADED = None
+
 END = '$'
 WILD = '?'
 
+_MORE_MASK = 0x80000000
+_LETTER_MASK = 0x7f000000
+_LINK_MASK = 0x00ffffff
+_END_CODE = ord(END) << 24
+_CHARS = [chr(code) for code in range(128)]
+_FIRST_CODE = ord('a')
+_ALL_LETTERS = (1 << 26) - 1
+_WILD_SLOT = 26
+
+def _record_table(data, typecode='I'):
+    '''
+    Returns the little-endian table `data` as a sequence of unsigned
+    integers of the given array `typecode` ('I' for the packed 32-bit
+    records). On little-endian hosts this is a zero-copy memoryview of
+    `data`; otherwise a byte-swapped array copy is made.
+    '''
+    if sys.byteorder == 'little':
+        return memoryview(data).cast(typecode)
+    table = array.array(typecode, data)
+    table.byteswap()
+    return table
+
+def _little_endian_bytes(table):
+    '''
+    Returns the raw bytes of `table` in little-endian order, the
+    inverse of _record_table.
+    '''
+    if sys.byteorder == 'little':
+        return memoryview(table).cast('B')
+    table = array.array(memoryview(table).format, table)
+    table.byteswap()
+    return table.tobytes()
+
+def _decode_table(data):
+    '''
+    Decodes the base-64 encoded, zlib-compressed module literal into
+    the raw record table.
+    '''
+    return zlib.decompress(base64.b64decode(data))
+
+_CACHE_MAGIC = b'TWLDAWG\x00'
+_CACHE_VERSION = 2
+_CACHE_HEADER = struct.Struct('<8sII32s')
+_CACHE_SECTION = struct.Struct('<8sQQ')
+
+def _cache_path(cache_dir, digest):
+    return os.path.join(cache_dir, 'twl-%s-v%d.dawg' % (digest.hex()[:16], _CACHE_VERSION))
+
+def _write_cache(path, digest, sections):
+    '''
+    Atomically writes `sections`, a list of (name, bytes) pairs, to the
+    cache file at `path`. Each section is 8-byte aligned so it can be
+    cast to a typed memoryview once mapped.
+    '''
+    offset = _CACHE_HEADER.size + _CACHE_SECTION.size * len(sections)
+    entries = []
+    for name, payload in sections:
+        offset = (offset + 7) & ~7
+        size = memoryview(payload).nbytes
+        entries.append((name.encode('ascii'), offset, size))
+        offset += size
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, len(entries), digest))
+            for entry in entries:
+                f.write(_CACHE_SECTION.pack(*entry))
+            for (_, payload), (_, offset, _) in zip(sections, entries):
+                f.write(b'\x00' * (offset - f.tell()))
+                f.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def _read_cache(path, digest):
+    '''
+    Memory-maps the cache file at `path` and returns a dict mapping
+    section names to memoryviews of the mapping. Returns None if the
+    file is missing, truncated, from another version or was built
+    from different data.
+    '''
+    try:
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(buf)
+    if len(view) < _CACHE_HEADER.size:
+        return None
+    magic, version, count, stored_digest = _CACHE_HEADER.unpack_from(view)
+    if (magic, version, stored_digest) != (_CACHE_MAGIC, _CACHE_VERSION, digest):
+        return None
+    sections = {}
+    for i in range(count):
+        position = _CACHE_HEADER.size + i * _CACHE_SECTION.size
+        if position + _CACHE_SECTION.size > len(view):
+            return None
+        name, offset, size = _CACHE_SECTION.unpack_from(view, position)
+        if offset + size > len(view):
+            return None
+        sections[name.rstrip(b'\x00').decode('ascii')] = view[offset:offset + size]
+    return sections
+
+def _data_digest(data):
+    '''
+    Returns the SHA-256 digest of `data`, the module literal or a raw
+    record table.
+    '''
+    return hashlib.sha256(data.encode('ascii') if isinstance(data, str) else data).digest()
+
+def _map_file(path):
+    '''
+    Memory-maps the record table file at `path` read-only.
+    '''
+    with open(path, 'rb') as f:
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+def _load(data, cache_dir=None, backend='compact'):
+    '''
+    Builds a DAWG of the given `backend` from `data`, which is either
+    the module literal or a raw record table. With a `cache_dir` the
+    record table and the per-node tables built from it are
+    memory-mapped from a cache file, which is written first if needed.
+    If the cache cannot be written the tables are kept in memory
+    instead.
+    '''
+    cls = _BACKENDS[backend]
+    embedded = isinstance(data, str)
+    if cache_dir is None:
+        return cls(_decode_table(data) if embedded else data)
+    digest = _data_digest(data)
+    path = _cache_path(cache_dir, digest)
+    sections = _read_cache(path, digest)
+    if sections is None:
+        dawg = cls(_decode_table(data) if embedded else data)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _write_cache(path, digest, dawg._get_cache_sections())
+        except OSError:
+            return dawg
+        sections = _read_cache(path, digest)
+        if sections is None:
+            return dawg
+    return cls(sections['records'], sections)
+
+def _compile_pattern(pattern):
+    '''
+    Turns a match() pattern into one 128-entry table per position,
+    holding 1 for every letter code allowed at that position.
+    '''
+    allowed = []
+    for letters in pattern:
+        codes = bytearray(128)
+        for letter in letters:
+            if letter == WILD:
+                for code in range(ord('a'), ord('z') + 1):
+                    codes[code] = 1
+            else:
+                codes[ord(letter)] = 1
+        allowed.append(codes)
+    return allowed
+
+def _later_letter_masks(allowed):
+    '''
+    Returns, for each position of a compiled pattern and one past its
+    end, the 26-bit mask of letters allowed at that position or later.
+    '''
+    later = [0] * (len(allowed) + 1)
+    for position in range(len(allowed) - 1, -1, -1):
+        mask = later[position + 1]
+        for code in range(_FIRST_CODE, _FIRST_CODE + 26):
+            if allowed[position][code]:
+                mask |= 1 << (code - _FIRST_CODE)
+        later[position] = mask
+    return later
+
+def _letter_bag(letters, min_len=None, max_len=None):
+    '''
+    Counts `letters` into a 27-slot list, one slot per letter 'a' to
+    'z' followed by one for WILD; other characters can never be placed
+    and are dropped. Also returns the length bounds, with defaults
+    filled in and `max_len` capped at the number of tiles.
+    '''
+    bag = [0] * 27
+    for letter in letters:
+        if letter == WILD:
+            bag[_WILD_SLOT] += 1
+        elif 'a' <= letter <= 'z':
+            bag[ord(letter) - _FIRST_CODE] += 1
+    tiles = sum(bag)
+    max_len = tiles if max_len is None else min(max_len, tiles)
+    return bag, min_len or 0, max_len
+
+def _bag_letter_mask(bag):
+    '''
+    Returns the 26-bit mask of letters with at least one tile left in
+    `bag` (see _letter_bag), ignoring wildcards.
+    '''
+    mask = 0
+    for slot in range(26):
+        if bag[slot]:
+            mask |= 1 << slot
+    return mask
+
+def _reaches(mask, low, high):
+    '''
+    Returns True if the length mask `mask` (see _get_length_masks)
+    holds some length between `low` and `high`, inclusive.
+    '''
+    low = max(low, 0)
+    if low > high:
+        return False
+    low = min(low, _LENGTH_CAP)
+    high = min(high, _LENGTH_CAP)
+    return bool(mask >> low & ((2 << (high - low)) - 1))
+
+_LENGTH_CAP = 63
+_SLOTS = dict((letter, slot) for slot, letter in enumerate('abcdefghijklmnopqrstuvwxyz' + END))
+_LENGTH_CAP_BIT = 1 << _LENGTH_CAP
+
 class _Dawg(object):
-    def __init__(self, data):
-        data = base64.b64decode(data)
-        data = zlib.decompress(data)
+    # Per-node tables built on first use: (cache section, attribute, array typecode)
+    _NODE_TABLES = (
+        ('lengths', '_length_masks', 'Q'),
+        ('counts', '_word_counts', 'I'),
+        ('anyltrs', '_any_letters', 'I'),
+        ('allltrs', '_all_letters', 'I'),
+        ('kidltrs', '_child_letters', 'I'),
+        ('endltrs', '_end_letters', 'I'),
+    )
+    def __init__(self, data, sections=None):
         self.data = data
+        self.records = _record_table(data)
+        for section, attribute, typecode in self._NODE_TABLES:
+            table = None
+            if sections is not None and section in sections:
+                table = _record_table(sections[section], typecode)
+            setattr(self, attribute, table)
+    def _get_cache_sections(self):
+        '''
+        Returns the (name, bytes) sections written to the cache file:
+        the record table followed by every per-node table.
+        '''
+        self._get_length_masks()
+        self._get_word_counts()
+        self._get_letter_masks()
+        self._get_child_letters()
+        sections = [('records', self.data)]
+        for section, attribute, typecode in self._NODE_TABLES:
+            sections.append((section, _little_endian_bytes(getattr(self, attribute))))
+        return sections
+    def _get_postorder(self):
+        '''
+        Returns the start index of every node reachable from the root,
+        with each node listed after all of its children.
+        '''
+        records = self.records
+        seen = bytearray(len(records))
+        order = []
+        stack = [(0, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if seen[node]:
+                continue
+            seen[node] = 1
+            stack.append((node, True))
+            index = node
+            while True:
+                x = records[index]
+                link = x & _LINK_MASK
+                if x & _LETTER_MASK != _END_CODE and not seen[link]:
+                    stack.append((link, False))
+                if not x & _MORE_MASK:
+                    break
+                index += 1
+        return order
+    def _get_length_masks(self):
+        '''
+        Returns a table, indexed by node start index, of bitmasks of the
+        word lengths reachable below each node: bit n is set if some
+        path of n letters leads from the node to the end of a word.
+        Bit 63 stands for every length of 63 or more.
+        '''
+        if self._length_masks is None:
+            records = self.records
+            masks = array.array('Q', [0]) * len(records)
+            for node in self._get_postorder():
+                mask = 0
+                index = node
+                while True:
+                    x = records[index]
+                    if x & _LETTER_MASK == _END_CODE:
+                        mask |= 1
+                    else:
+                        child = masks[x & _LINK_MASK]
+                        mask |= (child << 1 | child & _LENGTH_CAP_BIT) & 0xffffffffffffffff
+                    if not x & _MORE_MASK:
+                        break
+                    index += 1
+                masks[node] = mask
+            self._length_masks = masks
+        return self._length_masks
     def _get_record(self, index):
-        a = index * 4
-        b = index * 4 + 4
-        x = struct.unpack('<I', self.data[a:b])[0]
-        more = bool(x & 0x80000000)
-        letter = chr((x >> 24) & 0x7f)
-        link = int(x & 0xffffff)
+        x = self.records[index]
+        more = bool(x & _MORE_MASK)
+        letter = _CHARS[(x & _LETTER_MASK) >> 24]
+        link = x & _LINK_MASK
         return (more, letter, link)
     def _get_child(self, index, letter):
+        code = ord(letter) << 24
+        records = self.records
         while True:
-            more, other, link = self._get_record(index)
-            if other == letter:
-                return link
-            if not more:
+            x = records[index]
+            if x & _LETTER_MASK == code:
+                return x & _LINK_MASK
+            if not x & _MORE_MASK:
                 return None
             index += 1
     def _get_children(self, index):
         result = []
+        records = self.records
         while True:
-            more, letter, link = self._get_record(index)
-            result.append(letter)
-            if not more:
+            x = records[index]
+            result.append(_CHARS[(x & _LETTER_MASK) >> 24])
+            if not x & _MORE_MASK:
                 break
             index += 1
         return result
-    def _anagram(self, bag, index=0, letters=None):
-        letters = letters or []
+    def _anagram(self, bag, min_len, max_len):
+        records = self.records
+        masks = self._get_length_masks()
+        all_letters = self._get_letter_masks()[1]
+        if not _reaches(masks[0], min_len, max_len):
+            return
+        available = _bag_letter_mask(bag)
+        letters = []
+        used = []
+        stack = [0]
+        while stack:
+            index = stack[-1]
+            if index < 0:
+                stack.pop()
+                if used:
+                    key = used.pop()
+                    bag[key] += 1
+                    if key != _WILD_SLOT:
+                        available |= 1 << key
+                    letters.pop()
+                continue
+            x = records[index]
+            stack[-1] = index + 1 if x & _MORE_MASK else -1
+            depth = len(letters)
+            if x & _LETTER_MASK == _END_CODE:
+                if depth >= min_len:
+                    yield ''.join(letters)
+                continue
+            code = (x & _LETTER_MASK) >> 24
+            slot = code - _FIRST_CODE
+            if bag[slot]:
+                key = slot
+            elif bag[_WILD_SLOT]:
+                key = _WILD_SLOT
+            else:
+                continue
+            link = x & _LINK_MASK
+            if not _reaches(masks[link], min_len - depth - 1, max_len - depth - 1):
+                continue
+            available_after = available & ~(1 << key) if key != _WILD_SLOT and bag[key] == 1 else available
+            # Without wildcards, drop the subtree if every word below it needs a letter that is used up
+            if bag[_WILD_SLOT] == (key == _WILD_SLOT) and all_letters[link] & ~available_after:
+                continue
+            bag[key] -= 1
+            available = available_after
+            used.append(key)
+            letters.append(_CHARS[code])
+            stack.append(link)
+    def _count_anagrams(self, bag, min_len, max_len):
+        records = self.records
+        masks = self._get_length_masks()
+        all_letters = self._get_letter_masks()[1]
+        end_letters = self._get_child_letters()[1]
+        if not _reaches(masks[0], min_len, max_len):
+            return 0
+        available = _bag_letter_mask(bag)
+        # The remaining bag packed into one int, a fixed-width field per slot, so a state key is one int
+        width = max(bag).bit_length()
+        weights = [1 << (width * slot) for slot in range(len(bag))]
+        packed = sum(count * weight for count, weight in zip(bag, weights))
+        node_shift = width * len(bag)
+        # Words counted below each (node, remaining bag) state, for states entered with wildcards left,
+        # the only ones different paths reach often enough to repay the lookups
+        memo = {}
+        # Each frame is [next record index, words counted so far, bag slot used to enter, memo key or None]
+        stack = [[0, 0, None, None]]
         while True:
-            more, letter, link = self._get_record(index)
-            if letter == END:
-                yield ''.join(letters)
-            elif bag[letter]:
-                bag[letter] -= 1
-                letters.append(letter)
-                for word in self._anagram(bag, link, letters):
-                    yield word
-                letters.pop(-1)
-                bag[letter] += 1
-            elif bag[WILD]:
-                bag[WILD] -= 1
-                letters.append(letter)
-                for word in self._anagram(bag, link, letters):
-                    yield word
-                letters.pop(-1)
-                bag[WILD] += 1
-            if not more:
+            frame = stack[-1]
+            index = frame[0]
+            if index < 0:
+                stack.pop()
+                if not stack:
+                    return frame[1]
+                if frame[3] is not None:
+                    memo[frame[3]] = frame[1]
+                bag[frame[2]] += 1
+                packed += weights[frame[2]]
+                if frame[2] != _WILD_SLOT:
+                    available |= 1 << frame[2]
+                stack[-1][1] += frame[1]
+                continue
+            x = records[index]
+            frame[0] = index + 1 if x & _MORE_MASK else -1
+            depth = len(stack) - 1
+            if x & _LETTER_MASK == _END_CODE:
+                if depth >= min_len:
+                    frame[1] += 1
+                continue
+            slot = ((x & _LETTER_MASK) >> 24) - _FIRST_CODE
+            if bag[slot]:
+                key = slot
+            elif bag[_WILD_SLOT]:
+                key = _WILD_SLOT
+            else:
+                continue
+            link = x & _LINK_MASK
+            if not _reaches(masks[link], min_len - depth - 1, max_len - depth - 1):
+                continue
+            available_after = available & ~(1 << key) if key != _WILD_SLOT and bag[key] == 1 else available
+            if bag[_WILD_SLOT] == (key == _WILD_SLOT) and all_letters[link] & ~available_after:
+                continue
+            if depth + 2 >= max_len or masks[link] < 4:
+                # At most one more letter to place below the child, by tiles or by the words below it: count
+                # them from its '$' record and the mask of letters that end a word there, without entering it
+                if depth + 1 >= min_len and records[link] & _LETTER_MASK == _END_CODE:
+                    frame[1] += 1
+                if depth + 2 <= max_len and depth + 2 >= min_len:
+                    wild = bag[_WILD_SLOT] > (key == _WILD_SLOT)
+                    frame[1] += bin(end_letters[link] & (_ALL_LETTERS if wild else available_after)).count('1')
+                continue
+            bag[key] -= 1
+            packed -= weights[key]
+            if not bag[_WILD_SLOT]:
+                available = available_after
+                stack.append([link, 0, key, None])
+                continue
+            state = link << node_shift | packed
+            total = memo.get(state)
+            if total is None:
+                available = available_after
+                stack.append([link, 0, key, state])
+            else:
+                frame[1] += total
+                bag[key] += 1
+                packed += weights[key]
+    def search(self, length, fixed=None, forbidden=None, required=None, excluded=None):
+        records = self.records
+        masks = self._get_length_masks()
+        if length < 0 or not masks[0] >> min(length, _LENGTH_CAP) & 1:
+            return
+        fixed = fixed or {}
+        forbidden = forbidden or {}
+        required = required or {}
+        allowed = []
+        for position in range(length):
+            codes = bytearray(128)
+            if position in fixed:
+                codes[ord(fixed[position])] = 1
+            else:
+                for code in range(ord('a'), ord('z') + 1):
+                    codes[code] = 1
+            for letter in forbidden.get(position, ()):
+                codes[ord(letter)] = 0
+            allowed.append(codes)
+        need = [0] * 128
+        for letter, count in required.items():
+            need[ord(letter)] = count
+        cap = [length] * 128
+        for letter in excluded or ():
+            cap[ord(letter)] = need[ord(letter)]
+        deficit = sum(need)
+        if deficit > length:
+            return
+        any_letters, all_letters = self._get_letter_masks()
+        later = _later_letter_masks(allowed)
+        # Letters still short of their required count, and letters that may not be used again
+        missing = 0
+        capped = 0
+        for code in range(_FIRST_CODE, _FIRST_CODE + 26):
+            if need[code]:
+                missing |= 1 << (code - _FIRST_CODE)
+            if not cap[code]:
+                capped |= 1 << (code - _FIRST_CODE)
+        counts = [0] * 128
+        letters = []
+        stack = [0]
+        while stack:
+            index = stack[-1]
+            if index < 0:
+                stack.pop()
+                if letters:
+                    code = ord(letters.pop())
+                    counts[code] -= 1
+                    bit = 1 << (code - _FIRST_CODE)
+                    capped &= ~bit
+                    if counts[code] < need[code]:
+                        deficit += 1
+                        missing |= bit
+                continue
+            x = records[index]
+            stack[-1] = index + 1 if x & _MORE_MASK else -1
+            depth = len(letters)
+            if x & _LETTER_MASK == _END_CODE:
+                if depth == length:
+                    yield ''.join(letters)
+                continue
+            if depth == length:
+                continue
+            code = (x & _LETTER_MASK) >> 24
+            if not allowed[depth][code] or counts[code] == cap[code]:
+                continue
+            remaining = length - depth - 1
+            if deficit - (counts[code] < need[code]) > remaining:
+                continue
+            link = x & _LINK_MASK
+            if not masks[link] >> min(remaining, _LENGTH_CAP) & 1:
+                continue
+            bit = 1 << (code - _FIRST_CODE)
+            count = counts[code] + 1
+            missing_after = missing & ~bit if count >= need[code] else missing
+            capped_after = capped | bit if count == cap[code] else capped
+            # Drop the subtree if it lacks a required letter, or every word below it needs a letter that is capped
+            # or not allowed in any remaining position
+            if missing_after & ~any_letters[link] or all_letters[link] & (capped_after | ~later[depth + 1]):
+                continue
+            if counts[code] < need[code]:
+                deficit -= 1
+            counts[code] = count
+            missing = missing_after
+            capped = capped_after
+            letters.append(_CHARS[code])
+            stack.append(link)
+    def _match_paths(self, pattern, edges=None):
+        '''
+        Walks `pattern` one position at a time, keeping a dict from each
+        node reached by a matching prefix to the number of prefixes that
+        reach it, so shared suffixes are walked once per level. Returns
+        the 26-bit mask of letters allowed at each position and the dict
+        for the prefixes of every letter but the last one, or None if no
+        word has the pattern's length. If `edges` is a list, a dict from
+        node to its followed [(letter code, child)] edges, in letter
+        order, is appended to it for each of those levels.
+        '''
+        records = self.records
+        masks = self._get_length_masks()
+        all_letters = self._get_letter_masks()[1]
+        child_letters = self._get_child_letters()[0]
+        allowed = _compile_pattern(pattern)
+        later = _later_letter_masks(allowed)
+        length = len(allowed)
+        letter_masks = [sum(1 << (code - _FIRST_CODE) for code in range(_FIRST_CODE, _FIRST_CODE + 26)
+                            if allowed[depth][code]) for depth in range(length)]
+        if not length or not masks[0] >> min(length, _LENGTH_CAP) & 1:
+            return letter_masks, None
+        paths = {0: 1}
+        for depth in range(length - 1):
+            # Bit of the length mask for the letters still to place after this one
+            length_bit = 1 << min(length - depth - 1, _LENGTH_CAP)
+            letter_mask = letter_masks[depth]
+            excluded = ~later[depth + 1]
+            next_paths = {}
+            level = {} if edges is not None else None
+            for node, count in paths.items():
+                kids = child_letters[node]
+                wanted = kids & letter_mask
+                if not wanted:
+                    continue
+                followed = [] if level is not None else None
+                if wanted == kids:
+                    # Every edge is allowed, scan the node's records
+                    index = node
+                    while True:
+                        x = records[index]
+                        link = x & _LINK_MASK
+                        if (x & _LETTER_MASK != _END_CODE and masks[link] & length_bit
+                                and not all_letters[link] & excluded):
+                            next_paths[link] = next_paths.get(link, 0) + count
+                            if followed is not None:
+                                followed.append(((x & _LETTER_MASK) >> 24, link))
+                        if not x & _MORE_MASK:
+                            break
+                        index += 1
+                else:
+                    # Jump straight to the allowed edges: '$' first, then one record per lower letter
+                    first = node + (records[node] & _LETTER_MASK == _END_CODE)
+                    while wanted:
+                        bit = wanted & -wanted
+                        wanted ^= bit
+                        link = records[first + bin(kids & (bit - 1)).count('1')] & _LINK_MASK
+                        if masks[link] & length_bit and not all_letters[link] & excluded:
+                            next_paths[link] = next_paths.get(link, 0) + count
+                            if followed is not None:
+                                followed.append((_FIRST_CODE + bit.bit_length() - 1, link))
+                if followed:
+                    level[node] = followed
+            if level is not None:
+                edges.append(level)
+            paths = next_paths
+        return letter_masks, paths
+    def match(self, pattern):
+        end_letters = self._get_child_letters()[1]
+        edges = []
+        letter_masks, paths = self._match_paths(pattern, edges)
+        if not paths:
+            return
+        last = letter_masks[-1]
+        # Keep only the edges on the way to a complete match, from the last level up
+        live = set(node for node in paths if end_letters[node] & last)
+        for level in reversed(edges):
+            for node in list(level):
+                followed = [(code, link) for code, link in level[node] if link in live]
+                if followed:
+                    level[node] = followed
+                else:
+                    del level[node]
+            live = set(level)
+        if not live:
+            return
+        # Then walk only those edges, so the cost follows the number of matches
+        letters = []
+        stack = [iter([(None, 0)])]
+        while stack:
+            for code, link in stack[-1]:
+                if code is not None:
+                    letters.append(_CHARS[code])
+                if len(letters) == len(edges):
+                    prefix = ''.join(letters)
+                    ends = end_letters[link] & last
+                    while ends:
+                        bit = ends & -ends
+                        ends ^= bit
+                        yield prefix + _CHARS[_FIRST_CODE + bit.bit_length() - 1]
+                    if letters:
+                        letters.pop()
+                else:
+                    stack.append(iter(edges[len(letters)][link]))
                 break
-            index += 1
+            else:
+                stack.pop()
+                if letters:
+                    letters.pop()
+    def count_matches(self, pattern):
+        end_letters = self._get_child_letters()[1]
+        letter_masks, paths = self._match_paths(pattern)
+        if not paths:
+            return 0
+        # The last letter ends a word exactly when its edge leads to '$'
+        last = letter_masks[-1]
+        return sum(count * bin(end_letters[node] & last).count('1') for node, count in paths.items())
+    def memory_usage(self):
+        usage = {'records': memoryview(self.records).nbytes}
+        for section, attribute, typecode in self._NODE_TABLES:
+            table = getattr(self, attribute)
+            if table is not None:
+                usage[attribute[1:]] = memoryview(table).nbytes
+        return usage
+    def check_many(self, words):
+        words = list(words)
+        result = bytearray(len(words))
+        get_child = self._get_child
+        # path[i] is the node reached by the first i letters of the previous word
+        path = [0]
+        previous = ''
+        for position in sorted(range(len(words)), key=words.__getitem__):
+            word = words[position]
+            common = 0
+            limit = min(len(word), len(previous), len(path) - 1)
+            while common < limit and word[common] == previous[common]:
+                common += 1
+            del path[common + 1:]
+            previous = word
+            index = path[-1]
+            for letter in word[common:]:
+                index = get_child(index, letter)
+                if index is None:
+                    break
+                path.append(index)
+            else:
+                result[position] = get_child(index, END) is not None
+        return result
+    def count(self, prefix):
+        index = 0
+        for letter in prefix:
+            index = self._get_child(index, letter)
+            if index in (0, None):
+                return 0
+        return self._get_word_counts()[index]
+    def rank(self, word):
+        records = self.records
+        counts = self._get_word_counts()
+        result = 0
+        index = 0
+        for letter in itertools.chain(word, END):
+            code = ord(letter) << 24
+            while True:
+                x = records[index]
+                if x & _LETTER_MASK == code:
+                    break
+                if not x & _MORE_MASK:
+                    raise ValueError('%r is not in the dictionary' % word)
+                result += 1 if x & _LETTER_MASK == _END_CODE else counts[x & _LINK_MASK]
+                index += 1
+            index = x & _LINK_MASK
+        return result
+    def unrank(self, index):
+        records = self.records
+        counts = self._get_word_counts()
+        if not 0 <= index < counts[0]:
+            raise IndexError('word index out of range')
+        letters = []
+        node = 0
+        while True:
+            x = records[node]
+            if x & _LETTER_MASK == _END_CODE:
+                if index == 0:
+                    return ''.join(letters)
+                index -= 1
+            else:
+                link = x & _LINK_MASK
+                if index < counts[link]:
+                    letters.append(_CHARS[(x & _LETTER_MASK) >> 24])
+                    node = link
+                    continue
+                index -= counts[link]
+            node += 1
     def __contains__(self, word):
+        records = self.records
         index = 0
         for letter in itertools.chain(word, END):
-            index = self._get_child(index, letter)
-            if index is None:
-                return False
+            code = ord(letter) << 24
+            while True:
+                x = records[index]
+                if x & _LETTER_MASK == code:
+                    break
+                if not x & _MORE_MASK:
+                    return False
+                index += 1
+            index = x & _LINK_MASK
         return True
-    def __iter__(self, index=0, letters=None):
-        letters = letters or []
-        while True:
-            more, letter, link = self._get_record(index)
-            if letter == END:
+    def __iter__(self):
+        records = self.records
+        letters = []
+        stack = [0]
+        while stack:
+            index = stack[-1]
+            if index < 0:
+                stack.pop()
+                if letters:
+                    letters.pop()
+                continue
+            x = records[index]
+            stack[-1] = index + 1 if x & _MORE_MASK else -1
+            if x & _LETTER_MASK == _END_CODE:
                 yield ''.join(letters)
             else:
-                letters.append(letter)
-                for word in self.__iter__(link, letters):
-                    yield word
-                letters.pop(-1)
-            if not more:
-                break
-            index += 1
+                letters.append(_CHARS[(x & _LETTER_MASK) >> 24])
+                stack.append(x & _LINK_MASK)
+    def _get_word_counts(self):
+        '''
+        Returns a table, indexed by node start index, of the number of
+        words that end below each node.
+        '''
+        if self._word_counts is None:
+            records = self.records
+            counts = array.array('I', [0]) * len(records)
+            for node in self._get_postorder():
+                total = 0
+                index = node
+                while True:
+                    x = records[index]
+                    if x & _LETTER_MASK == _END_CODE:
+                        total += 1
+                    else:
+                        total += counts[x & _LINK_MASK]
+                    if not x & _MORE_MASK:
+                        break
+                    index += 1
+                counts[node] = total
+            self._word_counts = counts
+        return self._word_counts
+    def _get_letter_masks(self):
+        '''
+        Returns two tables indexed by node start index, each holding a
+        26-bit letter mask per node (bit 0 for 'a'). The first has the
+        letters that appear on some path from the node to the end of a
+        word; the second has the letters that appear on every such path.
+        '''
+        if self._any_letters is None or self._all_letters is None:
+            records = self.records
+            any_letters = array.array('I', [0]) * len(records)
+            all_letters = array.array('I', [0]) * len(records)
+            for node in self._get_postorder():
+                some = 0
+                every = _ALL_LETTERS
+                index = node
+                while True:
+                    x = records[index]
+                    if x & _LETTER_MASK == _END_CODE:
+                        every = 0
+                    else:
+                        link = x & _LINK_MASK
+                        bit = 1 << ((x & _LETTER_MASK) >> 24) - _FIRST_CODE
+                        some |= bit | any_letters[link]
+                        every &= bit | all_letters[link]
+                    if not x & _MORE_MASK:
+                        break
+                    index += 1
+                any_letters[node] = some
+                all_letters[node] = every
+            self._any_letters = any_letters
+            self._all_letters = all_letters
+        return self._any_letters, self._all_letters
+    def _get_child_letters(self):
+        '''
+        Returns two tables indexed by node start index, each holding a
+        26-bit letter mask per node (bit 0 for 'a'). The first has the
+        letters of the node's edges; the second has the letters whose
+        edge leads to the end of a word. Since a node's records are in
+        alphabetical order after '$', the child for a letter is found
+        by counting the lower bits of the first mask.
+        '''
+        if self._child_letters is None or self._end_letters is None:
+            records = self.records
+            child_letters = array.array('I', [0]) * len(records)
+            end_letters = array.array('I', [0]) * len(records)
+            for node in self._get_postorder():
+                kids = 0
+                ends = 0
+                index = node
+                while True:
+                    x = records[index]
+                    if x & _LETTER_MASK != _END_CODE:
+                        bit = 1 << ((x & _LETTER_MASK) >> 24) - _FIRST_CODE
+                        kids |= bit
+                        if records[x & _LINK_MASK] & _LETTER_MASK == _END_CODE:
+                            ends |= bit
+                    if not x & _MORE_MASK:
+                        break
+                    index += 1
+                child_letters[node] = kids
+                end_letters[node] = ends
+            self._child_letters = child_letters
+            self._end_letters = end_letters
+        return self._child_letters, self._end_letters
+    def words_by_length(self, lengths=None):
+        records = self.records
+        masks = self._get_length_masks()
+        if lengths is None:
+            lengths = [length for length in range(_LENGTH_CAP) if masks[0] >> length & 1]
+        buffers = dict((length, bytearray()) for length in lengths)
+        wanted = 0
+        for length in buffers:
+            if length >= 0:
+                wanted |= 1 << min(length, _LENGTH_CAP)
+        path = bytearray()
+        stack = [0]
+        while stack:
+            index = stack[-1]
+            if index < 0:
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            x = records[index]
+            stack[-1] = index + 1 if x & _MORE_MASK else -1
+            depth = len(path)
+            if x & _LETTER_MASK == _END_CODE:
+                if depth in buffers:
+                    buffers[depth] += path
+                continue
+            link = x & _LINK_MASK
+            if depth + 1 < _LENGTH_CAP and not masks[link] << (depth + 1) & wanted:
+                continue
+            path.append((x & _LETTER_MASK) >> 24)
+            stack.append(link)
+        return dict((length, bytes(buffer)) for length, buffer in buffers.items())
+    def words_of_length(self, length):
+        records = self.records
+        masks = self._get_length_masks()
+        if length < 0 or not masks[0] >> min(length, _LENGTH_CAP) & 1:
+            return
+        letters = []
+        stack = [0]
+        while stack:
+            index = stack[-1]
+            if index < 0:
+                stack.pop()
+                if letters:
+                    letters.pop()
+                continue
+            x = records[index]
+            stack[-1] = index + 1 if x & _MORE_MASK else -1
+            if x & _LETTER_MASK == _END_CODE:
+                if len(letters) == length:
+                    yield ''.join(letters)
+                continue
+            remaining = length - len(letters) - 1
+            link = x & _LINK_MASK
+            if remaining >= 0 and masks[link] >> min(remaining, _LENGTH_CAP) & 1:
+                letters.append(_CHARS[(x & _LETTER_MASK) >> 24])
+                stack.append(link)
     def children(self, prefix):
         index = 0
         for letter in prefix:
@@ -248,14 +1355,141 @@ class _Dawg(object):
             if index in (0, None):
                 return []
         return self._get_children(index)
-    def anagram(self, letters):
-        bag = collections.defaultdict(int)
-        for letter in letters:
-            bag[letter] += 1
-        for word in self._anagram(bag):
+    def anagram(self, letters, min_len=None, max_len=None):
+        bag, min_len, max_len = _letter_bag(letters, min_len, max_len)
+        for word in self._anagram(bag, min_len, max_len):
             yield word
+    def count_anagrams(self, letters, min_len=None, max_len=None):
+        bag, min_len, max_len = _letter_bag(letters, min_len, max_len)
+        return self._count_anagrams(bag, min_len, max_len)
+
+class _Cursor(object):
+    '''
+    A position in a _Dawg, see cursor(). `index` is the start index of
+    the current node, or None once a letter has been advanced that no
+    word continues with.
+    '''
+    __slots__ = ('dawg', 'index')
+    def __init__(self, dawg, index=0):
+        self.dawg = dawg
+        self.index = index
+    def advance(self, letter):
+        '''
+        Moves past `letter`. Returns False, and leaves the cursor dead,
+        if no word continues with it.
+        '''
+        if self.index is not None:
+            self.index = self.dawg._get_child(self.index, letter)
+            if self.index == 0:
+                self.index = None
+        return self.index is not None
+    @property
+    def is_prefix(self):
+        '''
+        True if some word starts with the letters advanced so far.
+        '''
+        return self.index is not None
+    @property
+    def is_word(self):
+        '''
+        True if the letters advanced so far form a word.
+        '''
+        return self.index is not None and self.dawg._get_child(self.index, END) is not None
+    def children(self):
+        '''
+        Returns a list of letters that may come next, like children().
+        '''
+        if self.index is None:
+            return []
+        return self.dawg._get_children(self.index)
+    def fork(self):
+        '''
+        Returns an independent copy of this cursor.
+        '''
+        return _Cursor(self.dawg, self.index)
+
+class _DenseDawg(_Dawg):
+    '''
+    A _Dawg that follows edges through a dense transition table with
+    one row of 27 slots ('a' to 'z', then END) per node, instead of
+    scanning sibling records. Each slot holds the child's start index,
+    or -1 if there is no such edge.
+    '''
+    def __init__(self, data, sections=None):
+        super(_DenseDawg, self).__init__(data, sections)
+        records = self.records
+        self.node_ids = array.array('i', [-1]) * len(records)
+        nodes = self._get_postorder()
+        self.transitions = array.array('i', [-1]) * (len(nodes) * len(_SLOTS))
+        for node_id, node in enumerate(nodes):
+            self.node_ids[node] = node_id
+            row = node_id * len(_SLOTS)
+            index = node
+            while True:
+                x = records[index]
+                self.transitions[row + _SLOTS[_CHARS[(x & _LETTER_MASK) >> 24]]] = x & _LINK_MASK
+                if not x & _MORE_MASK:
+                    break
+                index += 1
+    def _get_child(self, index, letter):
+        slot = _SLOTS.get(letter)
+        if slot is None:
+            return None
+        link = self.transitions[self.node_ids[index] * len(_SLOTS) + slot]
+        return None if link < 0 else link
+    def __contains__(self, word):
+        transitions = self.transitions
+        node_ids = self.node_ids
+        width = len(_SLOTS)
+        index = 0
+        for letter in itertools.chain(word, END):
+            slot = _SLOTS.get(letter)
+            if slot is None:
+                return False
+            index = transitions[node_ids[index] * width + slot]
+            if index < 0:
+                return False
+        return True
+    def memory_usage(self):
+        usage = super(_DenseDawg, self).memory_usage()
+        usage['node_ids'] = memoryview(self.node_ids).nbytes
+        usage['transitions'] = memoryview(self.transitions).nbytes
+        return usage
+
+_BACKENDS = {'compact': _Dawg, 'dense': _DenseDawg}
+
+_LOAD_LOCK = threading.Lock()
+_LOADED = None
+_OPTIONS = {
+    'cache_dir': os.environ.get('TWL_CACHE_DIR') or None,
+    'backend': os.environ.get('TWL_BACKEND') or 'compact',
+    'dictionary': os.environ.get('TWL_DICTIONARY') or None,
+}
+
+def _get_dawg():
+    '''
+    Returns the shared _Dawg, decoding the embedded table on first use.
+    The lock guarantees concurrent first callers decode it only once.
+    '''
+    global _LOADED
+    dawg = _LOADED
+    if dawg is None:
+        with _LOAD_LOCK:
+            dawg = _LOADED
+            if dawg is None:
+                if _OPTIONS['dictionary'] is None:
+                    data = _DATA
+                else:
+                    data = _map_file(_OPTIONS['dictionary'])
+                dawg = _LOADED = _load(data, _OPTIONS['cache_dir'], _OPTIONS['backend'])
+    return dawg
+
+def __getattr__(name):
+    if name == '_DAWG':
+        return _get_dawg()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
-_DAWG = _Dawg(
+_DATA = (
     "eJxknXd8lMXTwOfSLr33nmDvvStWsCB2UUDwkhxJII1LAgkqiB3svYvYBRvYBUUFG9gbYs"
     "OUIwmkkYRi5f3O7nM5+L1/3OfueXZ3+s7ObLtskZa3yqT1rv2l7aAHpf25a8W/3yeyoe91"
     "6fi+Rzq7f5au2W7XxpUu16bj93Z13xfj6ukb7epdcaSr76cJrv47L3VtPvBd18DZN7kGBz"
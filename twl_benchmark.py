@@ -0,0 +1,126 @@
+import argparse
+import collections
+import time
+
+import twl
+
+parser = argparse.ArgumentParser(description='Benchmarks for the twl DAWG traversals.')
+parser.add_argument("-r", "--repeat", type=int, help="Set number of timed runs per case", default=3)
+
+ANAGRAM_RACKS = ['retains', 'retain??', 'ab????', '???????']
+MATCH_PATTERNS = ['?o?e?', 's???e', '?????']
+
+
+# The recursive traversals twl used before the explicit-stack engine, kept as a baseline
+def recursive_iter(dawg, index=0, letters=None):
+    letters = letters or []
+    records = dawg.records
+    while True:
+        x = records[index]
+        if x & twl._LETTER_MASK == twl._END_CODE:
+            yield ''.join(letters)
+        else:
+            letters.append(twl._CHARS[(x & twl._LETTER_MASK) >> 24])
+            for word in recursive_iter(dawg, x & twl._LINK_MASK, letters):
+                yield word
+            letters.pop(-1)
+        if not x & twl._MORE_MASK:
+            break
+        index += 1
+
+
+def recursive_anagram(dawg, bag, index=0, letters=None):
+    letters = letters or []
+    records = dawg.records
+    while True:
+        x = records[index]
+        letter = twl._CHARS[(x & twl._LETTER_MASK) >> 24]
+        link = x & twl._LINK_MASK
+        if letter == twl.END:
+            yield ''.join(letters)
+        elif bag[letter]:
+            bag[letter] -= 1
+            letters.append(letter)
+            for word in recursive_anagram(dawg, bag, link, letters):
+                yield word
+            letters.pop(-1)
+            bag[letter] += 1
+        elif bag[twl.WILD]:
+            bag[twl.WILD] -= 1
+            letters.append(letter)
+            for word in recursive_anagram(dawg, bag, link, letters):
+                yield word
+            letters.pop(-1)
+            bag[twl.WILD] += 1
+        if not x & twl._MORE_MASK:
+            break
+        index += 1
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(name, baseline, current):
+    print('{:<24} {:>10.4f}s {:>10.4f}s {:>7.2f}x'.format(name, baseline, current, baseline / current))
+
+
+def run_traversal_benchmarks(repeat):
+    dawg = twl._get_dawg()
+    # Build the lazy node tables first so the first case doesn't time them
+    dawg._get_length_masks()
+    dawg._get_letter_masks()
+    dawg._get_child_letters()
+    # The current engines: the explicit stack, plus the length and letter pruning added since
+    print('{:<24} {:>11} {:>11} {:>8}'.format('case', 'recursive', 'current', 'speedup'))
+    report('iterate all words',
+           best_time(lambda: sum(1 for _ in recursive_iter(dawg)), repeat),
+           best_time(lambda: sum(1 for _ in dawg), repeat))
+    for rack in ANAGRAM_RACKS:
+        report('anagram ' + rack,
+               best_time(lambda: sum(1 for _ in recursive_anagram(dawg, collections.Counter(rack))), repeat),
+               best_time(lambda: sum(1 for _ in dawg.anagram(rack)), repeat))
+
+
+def run_count_benchmarks(repeat):
+    dawg = twl._get_dawg()
+    print('{:<24} {:>11} {:>11} {:>8}'.format('case', 'enumerate', 'count', 'speedup'))
+    for rack in ANAGRAM_RACKS:
+        report('count anagrams ' + rack,
+               best_time(lambda: sum(1 for _ in dawg.anagram(rack)), repeat),
+               best_time(lambda: dawg.count_anagrams(rack), repeat))
+    for pattern in MATCH_PATTERNS:
+        report('count matches ' + pattern,
+               best_time(lambda: sum(1 for _ in dawg.match(pattern)), repeat),
+               best_time(lambda: dawg.count_matches(pattern), repeat))
+
+
+def run_backend_benchmarks(repeat):
+    words = list(twl.iterator())
+    prefixes = sorted(set(word[:3] for word in words))
+    options = dict(twl._OPTIONS)
+    print('{:<10} {:>10} {:>12} {:>12} {:>12}'.format('backend', 'load', 'check all', 'children', 'memory'))
+    for backend in ('compact', 'dense'):
+        twl.configure(backend=backend)
+        load_time = best_time(lambda: twl.configure(backend=backend) or twl._get_dawg(), repeat)
+        check_time = best_time(lambda: all(twl.check(word) for word in words), repeat)
+        children_time = best_time(lambda: [twl.children(prefix) for prefix in prefixes], repeat)
+        memory = sum(twl.memory_usage().values())
+        print('{:<10} {:>9.4f}s {:>11.4f}s {:>11.4f}s {:>9.1f} KB'.format(
+            backend, load_time, check_time, children_time, memory / 1024.0))
+    twl.configure(**options)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    run_traversal_benchmarks(args.repeat)
+    print()
+    run_count_benchmarks(args.repeat)
+    print()
+    run_backend_benchmarks(args.repeat)
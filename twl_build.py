@@ -0,0 +1,216 @@
+'''
+Compiles a word list into the packed DAWG record table used by twl.
+
+The input is a text file with one word per line, in any order. Words
+are lowercased, blank lines are skipped, and duplicates are dropped.
+Only the letters a to z may appear in a word.
+
+The output is the raw table described in the twl module docstring:
+one little-endian 32-bit record per edge, with each node stored as a
+run of records ('$' first if a word ends there, then its children in
+alphabetical order) and the root at index 0. It can be loaded with
+twl.configure(dictionary=path).
+
+The DAWG is built incrementally from words in sorted order (Daciuk et
+al., "Incremental Construction of Minimal Acyclic Finite-State
+Automata"). Each finished branch is merged into an equivalent node
+that is already registered, if there is one, so memory follows the
+size of the minimized DAWG rather than the number of words. Unsorted
+input is first sorted in chunks of bounded size and merged from
+temporary files.
+
+Sample usage:
+
+$ python twl_build.py words.txt words.dawg
+'''
+
+import argparse
+import array
+import heapq
+import itertools
+import sys
+import tempfile
+import time
+
+import twl
+
+parser = argparse.ArgumentParser(description='Compile a word list into a twl DAWG table.')
+parser.add_argument("source", help="Word list with one word per line")
+parser.add_argument("destination", help="Path of the record table to write")
+parser.add_argument("-s", "--sorted", action="store_true", help="Input is already sorted, skip the external sort")
+parser.add_argument("-c", "--chunk_size", type=int, help="Set number of words sorted in memory at once",
+                    default=1000000)
+
+MAX_RECORDS = twl._LINK_MASK + 1
+
+
+class DawgBuilder(object):
+    '''
+    Builds a minimized DAWG from words added in sorted order, then
+    packs it into a twl record table.
+
+    >>> builder = DawgBuilder()
+    >>> for word in ['cat', 'cats', 'dog', 'dogs']:
+    ...     builder.add(word)
+    >>> table = builder.finish()
+    '''
+    def __init__(self):
+        # Node id -> [is final, list of (letter, child id)]
+        self.nodes = {0: [False, []]}
+        # (is final, children) -> node id, for every minimized node
+        self.register = {}
+        # Edges on the path of the previous word that are not minimized yet
+        self.unchecked = []
+        self.previous = ''
+        self.next_id = 1
+        self.word_count = 0
+    def add(self, word):
+        if not word:
+            raise ValueError('Cannot add an empty word')
+        if word <= self.previous:
+            if word == self.previous:
+                return
+            raise ValueError('Words must be added in sorted order: %r after %r' % (word, self.previous))
+        for letter in word:
+            if not 'a' <= letter <= 'z':
+                raise ValueError('Invalid letter %r in word %r' % (letter, word))
+        common = 0
+        for a, b in zip(word, self.previous):
+            if a != b:
+                break
+            common += 1
+        self._minimize(common)
+        node = self.unchecked[-1][2] if self.unchecked else 0
+        for letter in word[common:]:
+            child = self.next_id
+            self.next_id += 1
+            self.nodes[child] = [False, []]
+            self.nodes[node][1].append((letter, child))
+            self.unchecked.append((node, letter, child))
+            node = child
+        self.nodes[node][0] = True
+        self.previous = word
+        self.word_count += 1
+    def _minimize(self, depth):
+        while len(self.unchecked) > depth:
+            parent, letter, child = self.unchecked.pop()
+            final, edges = self.nodes[child]
+            key = (final, tuple(edges))
+            existing = self.register.get(key)
+            if existing is None:
+                self.register[key] = child
+            else:
+                self.nodes[parent][1][-1] = (letter, existing)
+                del self.nodes[child]
+    @property
+    def node_count(self):
+        return len(self.nodes)
+    def finish(self):
+        '''
+        Minimizes what is left of the last word and returns the packed
+        record table as little-endian bytes.
+        '''
+        self._minimize(0)
+        if not self.word_count:
+            raise ValueError('Cannot build a DAWG without words')
+        # Lay the nodes out depth-first from the root, one run of records each
+        order = []
+        offsets = {}
+        size = 0
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if node in offsets:
+                continue
+            final, edges = self.nodes[node]
+            offsets[node] = size
+            size += len(edges) + final
+            order.append(node)
+            stack.extend(child for letter, child in reversed(edges))
+        if size > MAX_RECORDS:
+            raise ValueError('DAWG needs %d records, more than the %d a 24-bit index allows' % (size, MAX_RECORDS))
+        records = array.array('I')
+        for node in order:
+            final, edges = self.nodes[node]
+            run = [(twl.END, 0)] if final else []
+            run.extend((letter, offsets[child]) for letter, child in edges)
+            for i, (letter, link) in enumerate(run):
+                more = twl._MORE_MASK if i < len(run) - 1 else 0
+                records.append(more | ord(letter) << 24 | link)
+        return bytes(twl._little_endian_bytes(records))
+
+
+def read_words(lines):
+    '''
+    Yields the lowercased, non-blank words of `lines`.
+    '''
+    for line in lines:
+        word = line.strip().lower()
+        if word:
+            yield word
+
+
+def sorted_words(words, chunk_size=1000000):
+    '''
+    Yields the distinct `words` in sorted order. Chunks of `chunk_size`
+    words are sorted in memory and spilled to temporary files, which
+    are then merged, so memory is bounded by the chunk size.
+    '''
+    chunk_files = []
+    try:
+        while True:
+            chunk = list(itertools.islice(words, chunk_size))
+            if not chunk_files and len(chunk) < chunk_size:
+                for word in sorted(set(chunk)):
+                    yield word
+                return
+            if not chunk:
+                break
+            chunk = sorted(set(chunk))
+            chunk_file = tempfile.TemporaryFile('w+')
+            chunk_file.writelines(word + '\n' for word in chunk)
+            chunk_file.seek(0)
+            chunk_files.append(chunk_file)
+        previous = None
+        for word in heapq.merge(*[(line.rstrip('\n') for line in chunk_file) for chunk_file in chunk_files]):
+            if word != previous:
+                yield word
+                previous = word
+    finally:
+        for chunk_file in chunk_files:
+            chunk_file.close()
+
+
+def compile_word_file(source, destination, presorted=False, chunk_size=1000000):
+    '''
+    Compiles the word list file `source` into the record table file
+    `destination`. Returns build statistics: a dict with the number of
+    'words', 'nodes' and 'records' and the 'seconds' taken.
+    '''
+    start = time.perf_counter()
+    builder = DawgBuilder()
+    with open(source) as f:
+        words = read_words(f)
+        if not presorted:
+            words = sorted_words(words, chunk_size)
+        for word in words:
+            builder.add(word)
+    table = builder.finish()
+    with open(destination, 'wb') as f:
+        f.write(table)
+    return {
+        'words': builder.word_count,
+        'nodes': builder.node_count,
+        'records': len(table) // 4,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    try:
+        stats = compile_word_file(args.source, args.destination, args.sorted, args.chunk_size)
+    except ValueError as e:
+        sys.exit('Error: {}'.format(e))
+    print('{words} words, {nodes} nodes, {records} records ({kb:.1f} KB) built in {seconds:.2f}s'.format(
+        kb=stats['records'] * 4 / 1024.0, **stats))
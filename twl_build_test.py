@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+import twl
+import twl_build
+
+
+class TestTwlBuildMethods(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'words.txt')
+        self.destination = os.path.join(self.directory.name, 'words.dawg')
+        self.options = dict(twl._OPTIONS)
+
+    def tearDown(self) -> None:
+        twl.configure(**self.options)
+        self.directory.cleanup()
+
+    def test_compile_word_file(self):
+        with open(self.source, 'w') as f:
+            f.write('Dogs\ncat\n\ncats\ndog\ncat\nscat\n')
+        stats = twl_build.compile_word_file(self.source, self.destination, chunk_size=2)
+        self.assertEqual(stats['words'], 5)
+        # Root, c, ca, d, do, s, sc, sca, one node shared by "cat" and "dog" and one shared by every word end
+        self.assertEqual(stats['nodes'], 10)
+        self.assertEqual(stats['records'] * 4, os.path.getsize(self.destination))
+        twl.configure(dictionary=self.destination)
+        self.assertEqual(list(twl.iterator()), ['cat', 'cats', 'dog', 'dogs', 'scat'])
+        self.assertTrue(twl.check('scat'))
+        self.assertFalse(twl.check('scats'))
+        self.assertEqual(twl.children('cat'), ['$', 's'])
+        self.assertEqual(list(twl.anagram('tacs')), ['cat', 'cats', 'scat'])
+
+    def test_builder_rejects_bad_input(self):
+        builder = twl_build.DawgBuilder()
+        builder.add('dog')
+        with self.assertRaises(ValueError):
+            builder.add('cat')
+        with self.assertRaises(ValueError):
+            builder.add('dog-')
+        with self.assertRaises(ValueError):
+            twl_build.DawgBuilder().finish()
+
+    def test_sorted_words(self):
+        words = ['pear', 'apple', 'fig', 'apple', 'kiwi', 'date', 'fig']
+        for chunk_size in (1, 2, 3, 100):
+            self.assertEqual(list(twl_build.sorted_words(iter(words), chunk_size)), sorted(set(words)))
@@ -0,0 +1,215 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import unittest
+
+import twl
+
+
+class TestTwlMethods(unittest.TestCase):
+    def test_check(self):
+        self.assertTrue(twl.check('dog'))
+        self.assertTrue(twl.check('word'))
+        self.assertFalse(twl.check('dgo'))
+        self.assertFalse(twl.check('asdf'))
+        self.assertFalse(twl.check('DOG'))
+
+    def test_check_many(self):
+        words = ['dog', 'dgo', 'dogs', '', 'do', 'dog', 'zzz', 'dogsled', 'dogsleds', 'doge', 'DOG']
+        self.assertEqual(twl.check_many(words), bytearray(twl.check(word) for word in words))
+        self.assertEqual(twl.check_many(iter(['aa', 'ab'])), bytearray([1, 1]))
+        self.assertEqual(twl.check_many([]), bytearray())
+
+    def test_iterator(self):
+        words = list(twl.iterator())
+        self.assertEqual(len(words), 178691)
+        self.assertEqual(words, sorted(words))
+
+    def test_words_of_length(self):
+        words = list(twl.iterator())
+        for length in (0, 2, 5, 15, 16):
+            expected = [word for word in words if len(word) == length]
+            self.assertEqual(list(twl.words_of_length(length)), expected)
+        self.assertEqual(len(list(twl.iterator(length=5))), 8938)
+
+    def test_length_masks(self):
+        dawg = twl._get_dawg()
+        masks = dawg._get_length_masks()
+        self.assertEqual(masks[0], sum(1 << length for length in range(2, 16)))
+        self.assertEqual(masks[dawg._get_child(0, 'q')] & 1, 0)
+
+    def test_words_by_length(self):
+        buffers = twl.words_by_length([2, 5, 16])
+        self.assertEqual(sorted(buffers), [2, 5, 16])
+        for length, buffer in buffers.items():
+            words = [buffer[i:i + length].decode('ascii') for i in range(0, len(buffer), length)]
+            self.assertEqual(words, list(twl.words_of_length(length)))
+        self.assertEqual(sorted(twl.words_by_length()), list(range(2, 16)))
+
+    def test_search(self):
+        self.assertEqual(list(twl.search(5)), list(twl.words_of_length(5)))
+        words = list(twl.search(5, fixed={1: 'i'}, forbidden={0: 'h', 2: 'l', 3: 'l'},
+                                required={'h': 1, 'l': 1}, excluded='ly'))
+        self.assertEqual(words, ['lichi', 'licht', 'light', 'lithe', 'litho', 'nihil'])
+        self.assertEqual(list(twl.search(3, required={'a': 4})), [])
+        self.assertTrue(all(word.count('e') == 2 for word in twl.search(5, required={'e': 2}, excluded='e')))
+
+    def test_match(self):
+        five_letter_words = list(twl.words_of_length(5))
+        expected = [word for word in five_letter_words if word[1] == 'o' and word[3] == 'e']
+        self.assertEqual(list(twl.match('?o?e?')), expected)
+        self.assertEqual(twl.count_matches('?o?e?'), len(expected))
+        self.assertEqual(list(twl.match(['bc', 'a', 't'])), ['bat', 'cat'])
+        self.assertEqual(twl.count_matches(['bc', 'a', 't']), 2)
+        self.assertEqual(twl.count_matches('?????'), len(five_letter_words))
+        self.assertEqual(twl.count_matches('?' * 16), 0)
+        for pattern in ('?v', '?c', ['wq', 'svrqp'], '?' * 14 + 'v', 'q'):
+            self.assertEqual(list(twl.match(pattern)), [])
+            self.assertEqual(twl.count_matches(pattern), 0)
+
+    def test_count(self):
+        self.assertEqual(twl.count(), 178691)
+        self.assertEqual(twl.count('dude'), 5)
+        self.assertEqual(twl.count('xq'), 0)
+
+    def test_rank_unrank(self):
+        words = list(twl.iterator())
+        for index in (0, 1, 1000, 98765, len(words) - 1):
+            self.assertEqual(twl.rank(words[index]), index)
+            self.assertEqual(twl.unrank(index), words[index])
+        with self.assertRaises(ValueError):
+            twl.rank('dgo')
+        with self.assertRaises(ValueError):
+            twl.rank('dudee')
+        with self.assertRaises(IndexError):
+            twl.unrank(len(words))
+
+    def test_dense_backend(self):
+        options = dict(twl._OPTIONS)
+        try:
+            twl.configure(backend='dense')
+            self.assertIsInstance(twl._get_dawg(), twl._DenseDawg)
+            self.assertTrue(twl.check('dog'))
+            self.assertFalse(twl.check('dgo'))
+            self.assertFalse(twl.check('DOG'))
+            self.assertEqual(twl.children('dude'), ['$', 'd', 'e', 's'])
+            self.assertEqual(twl.count('dude'), 5)
+            usage = twl.memory_usage()
+            self.assertGreater(usage['transitions'], usage['records'])
+        finally:
+            twl.configure(**options)
+        with self.assertRaises(ValueError):
+            twl.configure(backend='sparse')
+        self.assertEqual(twl._OPTIONS, options)
+
+    def test_letter_masks(self):
+        dawg = twl._get_dawg()
+        any_letters, all_letters = dawg._get_letter_masks()
+        self.assertEqual(any_letters[0], (1 << 26) - 1)
+        self.assertEqual(all_letters[0], 0)
+        node = dawg._get_child(dawg._get_child(0, 'q'), 'a')
+        expected_any = 0
+        expected_all = (1 << 26) - 1
+        for word in twl.iterator():
+            if word.startswith('qa'):
+                letters = sum(1 << (ord(letter) - ord('a')) for letter in set(word[2:]))
+                expected_any |= letters
+                expected_all &= letters
+        self.assertEqual(any_letters[node], expected_any)
+        self.assertEqual(all_letters[node], expected_all)
+
+    def test_children(self):
+        self.assertEqual(twl.children('dude'), ['$', 'd', 'e', 's'])
+        self.assertEqual(twl.children('b'), list('adehiloruwy'))
+        self.assertEqual(twl.children('xq'), [])
+
+    def test_cursor(self):
+        cursor = twl.cursor()
+        for letter in 'dude':
+            self.assertTrue(cursor.advance(letter))
+        self.assertTrue(cursor.is_word)
+        self.assertEqual(cursor.children(), twl.children('dude'))
+        fork = cursor.fork()
+        self.assertFalse(fork.advance('q'))
+        self.assertFalse(fork.is_prefix)
+        self.assertFalse(fork.advance('s'))
+        self.assertEqual(fork.children(), [])
+        self.assertTrue(cursor.advance('e'))
+        self.assertFalse(cursor.is_word)
+        self.assertTrue(twl.cursor('dudeen').is_word)
+        self.assertFalse(twl.cursor('dog$').is_prefix)
+
+    def test_anagram(self):
+        self.assertEqual(list(twl.anagram('top')), ['op', 'opt', 'pot', 'to', 'top'])
+        self.assertIn('zap', list(twl.anagram('za?')))
+        self.assertEqual(list(twl.anagram('top', min_len=3)), ['opt', 'pot', 'top'])
+        self.assertEqual(list(twl.anagram('top', max_len=2)), ['op', 'to'])
+        self.assertEqual(list(twl.anagram('top', min_len=4)), [])
+        self.assertEqual(list(twl.anagram('TOP')), [])
+
+    def test_count_anagrams(self):
+        for letters in ('top', 'retain??', 'ab????'):
+            words = list(twl.anagram(letters))
+            self.assertEqual(twl.count_anagrams(letters), len(words))
+            self.assertEqual(twl.count_anagrams(letters, min_len=4, max_len=5),
+                             sum(1 for word in words if 4 <= len(word) <= 5))
+
+    def test_record_table(self):
+        dawg = twl._DAWG
+        for index in (0, 1, 25, 25784, len(dawg.records) - 1):
+            x = struct.unpack('<I', dawg.data[index * 4:index * 4 + 4])[0]
+            self.assertEqual(dawg.records[index], x)
+        self.assertEqual(dawg._get_record(1), (True, 'b', 25784))
+        self.assertEqual(dawg._get_child(0, 'b'), 25784)
+
+    def test_lazy_load_is_shared_across_threads(self):
+        twl._LOADED = None
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(twl._get_dawg())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(dawg is results[0] for dawg in results))
+        self.assertIs(twl._DAWG, results[0])
+
+    def test_mmap_cache(self):
+        options = dict(twl._OPTIONS)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            try:
+                twl.configure(cache_dir=cache_dir)
+                self.assertTrue(twl.check('dog'))
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+                twl.configure(cache_dir=cache_dir)
+                dawg = twl._get_dawg()
+                self.assertIsInstance(dawg.data.obj, mmap.mmap)
+                self.assertEqual(set(dawg.memory_usage()),
+                                 {'records', 'length_masks', 'word_counts', 'any_letters', 'all_letters',
+                                  'child_letters', 'end_letters'})
+                self.assertEqual(twl.count('dude'), 5)
+                twl.configure(cache_dir=cache_dir, backend='dense')
+                self.assertTrue(twl.check('dog'))
+                self.assertEqual(twl.children('dude'), ['$', 'd', 'e', 's'])
+                self.assertEqual(list(twl.anagram('top')), ['op', 'opt', 'pot', 'to', 'top'])
+                self.assertEqual(sum(1 for _ in twl.iterator()), 178691)
+                self.assertIsNone(twl._read_cache(os.path.join(cache_dir, 'missing.dawg'), b''))
+            finally:
+                twl.configure(**options)
+
+    def test_configure_keeps_unset_options(self):
+        options = dict(twl._OPTIONS)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            try:
+                twl.configure(cache_dir=cache_dir)
+                twl.configure(backend='dense')
+                self.assertEqual(twl._OPTIONS, dict(options, cache_dir=cache_dir, backend='dense'))
+                self.assertIsInstance(twl._get_dawg(), twl._DenseDawg)
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+                twl.configure(cache_dir=None)
+                self.assertEqual(twl._OPTIONS, dict(options, cache_dir=None, backend='dense'))
+            finally:
+                twl.configure(**options)
+        self.assertEqual(twl._OPTIONS, options)
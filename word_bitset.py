@@ -0,0 +1,121 @@
+'''
+Wordle candidate sets as bitsets over word ids.
+
+A set of words is a Python int with bit i set when the word with id i,
+its index in the word list, is in the set. WordBitsetIndex precomputes
+the bitset of the words with each letter at each position, and of the
+words containing each letter at least k times, so applying a response
+to a candidate set is a few ANDs and AND-NOTs of whole bitsets, one
+per letter of the attempt, instead of a Python check per word.
+
+Responses follow Wordle's duplicate-letter rule, as in word_matrix: a
+letter marked correct (O) or misplaced (?) k times appears at least k
+times, and exactly k times if it is also marked not contained (X).
+
+Sample usage:
+
+>>> index = WordBitsetIndex(['FIGHT', 'LIGHT', 'NIGHT'])
+>>> bits = index.filter(index.all_words(), 'HILLY', '?O?XX')
+>>> index.words(bits)
+['LIGHT']
+'''
+
+
+def _bitset(ids, word_count):
+    '''
+    Returns the bitset of `ids`, set in one buffer rather than by
+    or-ing one bit at a time into an ever larger int.
+    '''
+    buffer = bytearray((word_count + 7) // 8)
+    for i in ids:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class WordBitsetIndex(object):
+    '''
+    Precomputed bitsets for `words`, a list of uppercase words of one
+    length. Word ids are indexes into that list.
+    '''
+    def __init__(self, words):
+        self.word_list = list(words)
+        self.word_count = len(self.word_list)
+        self.word_length = len(self.word_list[0]) if self.word_list else 0
+        position_ids = [{} for _ in range(self.word_length)]
+        count_ids = {}
+        for i, word in enumerate(self.word_list):
+            letter_counts = {}
+            for position, letter in enumerate(word):
+                position_ids[position].setdefault(letter, []).append(i)
+                letter_counts[letter] = letter_counts.get(letter, 0) + 1
+            for letter, count in letter_counts.items():
+                counts = count_ids.setdefault(letter, [[] for _ in range(self.word_length + 1)])
+                for k in range(1, count + 1):
+                    counts[k].append(i)
+        # Position -> letter -> words with that letter at that position
+        self.position_letters = [{letter: _bitset(ids, self.word_count) for letter, ids in letters.items()}
+                                 for letters in position_ids]
+        # Letter -> k -> words containing the letter at least k times, for k up to the word length
+        self.letter_counts = {letter: [self.all_words()] + [_bitset(ids, self.word_count) for ids in counts[1:]]
+                              for letter, counts in count_ids.items()}
+    def all_words(self):
+        return (1 << self.word_count) - 1
+    def at_least(self, letter, k):
+        '''
+        Returns the bitset of words containing `letter` at least `k` times.
+        '''
+        if k == 0:
+            return self.all_words()
+        counts = self.letter_counts.get(letter)
+        return counts[k] if counts is not None and k <= self.word_length else 0
+    def filter(self, bits, attempt, response):
+        '''
+        Returns the words of bitset `bits` that are consistent with
+        `response` to `attempt`, both uppercase strings.
+        '''
+        assert len(attempt) == len(response)
+        found_counts = {}
+        not_contained_letters = set()
+        for i in range(len(response)):
+            letter_bits = self.position_letters[i].get(attempt[i], 0)
+            if response[i] == 'O':
+                bits &= letter_bits
+                found_counts[attempt[i]] = found_counts.get(attempt[i], 0) + 1
+            elif response[i] == '?':
+                bits &= ~letter_bits
+                found_counts[attempt[i]] = found_counts.get(attempt[i], 0) + 1
+            elif response[i] == 'X':
+                bits &= ~letter_bits
+                not_contained_letters.add(attempt[i])
+            else:
+                raise ValueError('Invalid character in received response')
+        for letter in set(found_counts) | not_contained_letters:
+            count = found_counts.get(letter, 0)
+            bits &= self.at_least(letter, count)
+            if letter in not_contained_letters:
+                bits &= ~self.at_least(letter, count + 1)
+        return bits
+    def from_ids(self, ids):
+        '''
+        Returns the bitset of the words with `ids`.
+        '''
+        return _bitset(ids, self.word_count)
+    def ids(self, bits):
+        '''
+        Returns the ids of the words in bitset `bits`, in increasing order.
+        '''
+        ids = []
+        data = bits.to_bytes((self.word_count + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                ids.append(byte_index * 8 + low.bit_length() - 1)
+                byte ^= low
+        return ids
+    def words(self, bits):
+        '''
+        Returns the words in bitset `bits`, in word list order.
+        '''
+        return [self.word_list[i] for i in self.ids(bits)]
+    def count(self, bits):
+        return bin(bits).count('1')
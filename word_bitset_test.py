@@ -0,0 +1,33 @@
+import unittest
+
+import word_bitset
+
+
+class TestWordBitsetMethods(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = word_bitset.WordBitsetIndex(['ALLOT', 'HELLO', 'LEVEL', 'LLAMA', 'SALLY'])
+
+    def test_bitsets(self):
+        self.assertEqual(self.index.all_words(), 0b11111)
+        self.assertEqual(self.index.position_letters[0]['L'], 0b01100)
+        self.assertEqual(self.index.at_least('L', 1), 0b11111)
+        self.assertEqual(self.index.at_least('L', 2), 0b11111)
+        self.assertEqual(self.index.at_least('A', 2), 0b01000)
+        self.assertEqual(self.index.at_least('Z', 1), 0)
+        self.assertEqual(self.index.ids(0b10101), [0, 2, 4])
+        self.assertEqual(self.index.from_ids([0, 2, 4]), 0b10101)
+        self.assertEqual(self.index.count(0b10101), 3)
+
+    def test_filter_duplicate_letters(self):
+        all_words = self.index.all_words()
+        self.assertEqual(self.index.words(self.index.filter(all_words, 'LLAMA', '??XXX')), ['HELLO'])
+        self.assertEqual(self.index.filter(all_words, 'HILLY', 'XX?XX'), 0)
+        bits = self.index.filter(all_words, 'SOLLY', 'XX??X')
+        self.assertEqual(self.index.words(bits), ['LEVEL', 'LLAMA'])
+        self.assertEqual(self.index.words(self.index.filter(bits, 'LEVEL', 'OOOOO')), ['LEVEL'])
+        with self.assertRaises(ValueError):
+            self.index.filter(all_words, 'HELLO', 'OOOO!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,339 @@
+'''
+Vectorized Wordle filtering over a NumPy word matrix.
+
+Candidate words are kept as an (N, L) uint8 matrix of letter codes,
+0 for 'A' through 25 for 'Z', and candidate sets as sorted arrays of
+row indices. Applying a response to a set of candidates costs a few
+boolean masks over the matrix, instead of a Python call per word.
+
+Responses follow Wordle's duplicate-letter rule, as produced by
+wordle_solver.create_attempt_response: a letter marked correct (O) or
+misplaced (?) k times appears at least k times, and exactly k times
+if the same letter is also marked not contained (X) in that attempt.
+
+The response to every (guess, answer) pair can be precomputed as a
+pattern matrix of base-3 codes: position i of the response adds 3**i
+times 0 for X, 1 for ? and 2 for O. Pattern matrices are saved as
+versioned .npy files and memory-mapped when loaded again.
+
+Sample usage:
+
+>>> matrix = create_word_matrix(b'LIGHTNIGHTSIGHT', 5)
+>>> filter_word_matrix(matrix, 'HILLY', '?O?XX')
+array([0])
+>>> patterns = create_pattern_matrix(matrix, matrix)
+>>> pattern_response(patterns[0, 1], 5)
+'XOOOO'
+'''
+
+import os
+import tempfile
+
+import numpy as np
+
+FIRST_CODE = ord('A')
+PATTERN_VERSION = 1
+PATTERN_VALUES = {'X': 0, '?': 1, 'O': 2}
+PATTERN_LETTERS = 'X?O'
+# Guesses whose patterns are computed at once, bounding memory to a few (chunk, N) arrays
+PATTERN_CHUNK_SIZE = 64
+# Guesses whose pattern counts are taken at once, few enough for the counts to stay in cache
+COUNT_CHUNK_SIZE = 16
+# Weighting -> (position weight, presence weight) for score_words
+SCORE_WEIGHTINGS = {
+    # Candidates with the same letter at the same position
+    'position': (1, 0),
+    # Candidates containing the letter, once per distinct letter of the word
+    'presence': (0, 1),
+    # Both, so of two words with equal position scores the one with more distinct letters wins
+    'position_presence': (1, 1),
+}
+
+
+def create_word_matrix(words, word_length):
+    '''
+    Returns the (N, L) letter code matrix of `words`, a buffer of
+    fixed-width words such as twl.words_by_length or a word pack
+    returns. Upper and lowercase letters map to the same codes.
+    '''
+    matrix = np.frombuffer(words, dtype=np.uint8).reshape(-1, word_length)
+    return (matrix | 0x20) - (FIRST_CODE | 0x20)
+
+
+def filter_word_matrix(matrix, attempt, response, indices=None):
+    '''
+    Returns the sorted indices of the rows of `matrix` that are
+    consistent with `response` to `attempt`, both uppercase strings.
+    If `indices` is given, only those rows are considered, so the
+    result of one turn can be passed straight into the next.
+    '''
+    assert len(attempt) == len(response)
+    rows = matrix if indices is None else matrix[indices]
+    keep = np.ones(len(rows), dtype=bool)
+    found_counts = {}
+    not_contained_codes = set()
+    for i in range(len(response)):
+        code = ord(attempt[i]) - FIRST_CODE
+        if response[i] == 'O':
+            keep &= rows[:, i] == code
+            found_counts[code] = found_counts.get(code, 0) + 1
+        elif response[i] == '?':
+            keep &= rows[:, i] != code
+            found_counts[code] = found_counts.get(code, 0) + 1
+        elif response[i] == 'X':
+            keep &= rows[:, i] != code
+            not_contained_codes.add(code)
+        else:
+            raise ValueError('Invalid character in received response')
+    for code in set(found_counts) | not_contained_codes:
+        letter_counts = np.count_nonzero(rows == code, axis=1)
+        if code in not_contained_codes:
+            keep &= letter_counts == found_counts.get(code, 0)
+        else:
+            keep &= letter_counts >= found_counts[code]
+    kept = np.flatnonzero(keep)
+    return kept if indices is None else indices[kept]
+
+
+def pattern_dtype(word_length):
+    '''
+    Returns the smallest unsigned dtype that holds every pattern code
+    for words of `word_length` letters.
+    '''
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if 3 ** word_length - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError('Words of %d letters have too many patterns' % word_length)
+
+
+def pattern_code(response):
+    '''
+    Returns the pattern code of a response string such as 'XO?XX'.
+    '''
+    code = 0
+    for i in reversed(range(len(response))):
+        if response[i] not in PATTERN_VALUES:
+            raise ValueError('Invalid character in received response')
+        code = code * 3 + PATTERN_VALUES[response[i]]
+    return code
+
+
+def pattern_response(code, word_length):
+    '''
+    Returns the response string of pattern `code`.
+    '''
+    code = int(code)
+    letters = []
+    for _ in range(word_length):
+        code, value = divmod(code, 3)
+        letters.append(PATTERN_LETTERS[value])
+    return ''.join(letters)
+
+
+def letter_position_counts(matrix, indices=None):
+    '''
+    Returns the (L, 26) table of the number of rows of `matrix`, or of
+    its rows `indices`, with each letter code at each position.
+    '''
+    rows = matrix if indices is None else matrix[indices]
+    word_length = matrix.shape[1]
+    cells = rows + np.arange(0, 26 * word_length, 26)
+    return np.bincount(cells.ravel(), minlength=26 * word_length).reshape(word_length, 26)
+
+
+def first_occurrences(matrix):
+    '''
+    Returns an (N, L) boolean matrix, True where the letter of a word
+    does not appear earlier in the word.
+    '''
+    first = np.ones(matrix.shape, dtype=bool)
+    for i in range(1, matrix.shape[1]):
+        first[:, i] = (matrix[:, :i] != matrix[:, i:i + 1]).all(axis=1)
+    return first
+
+
+def letter_presence_counts(matrix, indices=None):
+    '''
+    Returns the number of rows of `matrix`, or of its rows `indices`,
+    containing each letter code.
+    '''
+    rows = matrix if indices is None else matrix[indices]
+    return np.bincount(rows[first_occurrences(rows)], minlength=26)
+
+
+def score_words(matrix, weighting='position', indices=None):
+    '''
+    Returns the frequency score of every row of `matrix` as a guess
+    against the candidate rows `indices` (default: every row), with a
+    weighting from SCORE_WEIGHTINGS. Each kind of frequency is an
+    (L, 26) table read with one gather over the code matrix and
+    summed per word, with repeated letters masked out for presence.
+    '''
+    position_weight, presence_weight = SCORE_WEIGHTINGS[weighting]
+    word_length = matrix.shape[1]
+    positions = np.arange(word_length)
+    scores = np.zeros(len(matrix), dtype=np.int64)
+    if position_weight:
+        table = position_weight * letter_position_counts(matrix, indices)
+        scores += table[positions, matrix].sum(axis=1)
+    if presence_weight:
+        table = np.tile(presence_weight * letter_presence_counts(matrix, indices), (word_length, 1))
+        scores += (table[positions, matrix] * first_occurrences(matrix)).sum(axis=1)
+    return scores
+
+
+def top_indices(scores, k):
+    '''
+    Returns the indices of the `k` highest `scores`, best first. Ties
+    go to the lowest index. Selection is O(N), only the k best and
+    any ties with the last of them are sorted.
+    '''
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+    candidates = np.flatnonzero(scores >= threshold)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+def create_pattern_matrix(guesses, answers):
+    '''
+    Returns the (G, A) matrix of pattern codes of the response to each
+    row of the `guesses` word matrix when the answer is each row of
+    `answers`, with the same duplicate-letter rule as the filter.
+    '''
+    word_length = guesses.shape[1]
+    dtype = pattern_dtype(word_length)
+    patterns = np.empty((len(guesses), len(answers)), dtype=dtype)
+    # Position-major copies, so each position is a contiguous (chunk, A) block below
+    answer_columns = np.ascontiguousarray(answers.T)
+    for start in range(0, len(guesses), PATTERN_CHUNK_SIZE):
+        chunk = guesses[start:start + PATTERN_CHUNK_SIZE]
+        correct = [chunk[:, i][:, None] == answer_columns[i][None, :] for i in range(word_length)]
+        # Letters not matched by a correct letter, with 26 and 27 standing in for matched ones
+        answer_left = [np.where(correct[i], 26, answer_columns[i][None, :]).astype(np.uint8)
+                       for i in range(word_length)]
+        guess_left = [np.where(correct[i], 27, chunk[:, i][:, None]).astype(np.uint8) for i in range(word_length)]
+        codes = np.zeros((len(chunk), len(answers)), dtype=dtype)
+        for i in range(word_length):
+            # Misplaced if the answer has more unmatched copies of the letter than earlier positions used up
+            available = np.zeros(codes.shape, dtype=np.int8)
+            for j in range(word_length):
+                available += answer_left[j] == guess_left[i]
+            for j in range(i):
+                available -= guess_left[j] == guess_left[i]
+            codes += (correct[i] * dtype.type(2) + (available > 0)) * dtype.type(3 ** i)
+        patterns[start:start + len(chunk)] = codes
+    return patterns
+
+
+def _pattern_counts(patterns, word_length, candidates=None):
+    '''
+    Yields (start, counts) for consecutive chunks of guesses, the rows
+    of `patterns` from `start` on, where counts[g, code] is the number
+    of `candidates` (default: every column) that would give pattern
+    `code` in response to guess start + g.
+    '''
+    pattern_count = 3 ** word_length
+    # A plain view of a memory-mapped matrix, as slicing np.memmap itself has a per-call cost
+    patterns = np.asarray(patterns)
+    for start in range(0, len(patterns), COUNT_CHUNK_SIZE):
+        rows = patterns[start:start + COUNT_CHUNK_SIZE]
+        if candidates is not None:
+            # np.take keeps the gathered rows C-contiguous, unlike rows[:, candidates]
+            rows = np.take(rows, candidates, axis=1)
+        # One bincount for the whole chunk, each row counted in its own range of bins
+        offsets = np.arange(0, len(rows) * pattern_count, pattern_count)
+        counts = np.bincount((rows + offsets[:, None]).ravel(), minlength=len(rows) * pattern_count)
+        yield start, counts.reshape(len(rows), pattern_count)
+
+
+def partition_statistics(patterns, word_length, candidates=None):
+    '''
+    Returns statistics of the partition of `candidates` by the response
+    to each guess, one row of `patterns` per guess, as a dict of arrays
+    with one entry per guess:
+
+    entropy        the expected information in bits, higher is better
+    max_size       the size of the largest part, the worst case
+    expected_size  the expected number of candidates left
+
+    Every statistic comes from the same pattern counts, so computing
+    all of them costs about as much as computing one.
+    '''
+    candidate_count = patterns.shape[1] if candidates is None else len(candidates)
+    size_bits = np.zeros(len(patterns))
+    size_squares = np.zeros(len(patterns), dtype=np.int64)
+    max_sizes = np.zeros(len(patterns), dtype=np.int64)
+    if candidate_count:
+        # Tables over every possible count, so each chunk is a gather and a sum per statistic
+        sizes = np.arange(candidate_count + 1)
+        bits_table = sizes * np.log2(np.maximum(sizes, 1))
+        squares_table = sizes * sizes
+        for start, counts in _pattern_counts(patterns, word_length, candidates):
+            end = start + len(counts)
+            size_bits[start:end] = bits_table[counts].sum(axis=1)
+            size_squares[start:end] = squares_table[counts].sum(axis=1)
+            max_sizes[start:end] = counts.max(axis=1)
+    count = max(candidate_count, 1)
+    return {
+        'entropy': np.log2(count) - size_bits / count,
+        'max_size': max_sizes,
+        'expected_size': size_squares / count,
+    }
+
+
+def best_guess(scores, candidates=None):
+    '''
+    Returns the index of the highest of `scores`. Ties, up to floating
+    point error, go to one of `candidates`, which could be the answer,
+    and then to the lowest index.
+    '''
+    ties = np.flatnonzero(scores >= scores.max() - 1e-9)
+    if candidates is not None:
+        preferred = ties[np.isin(ties, candidates)]
+        if len(preferred):
+            return int(preferred[0])
+    return int(ties[0])
+
+
+def pattern_matrix_path(directory, digest, word_length):
+    '''
+    Returns the path of the pattern matrix for the dictionary with hex
+    `digest` and `word_length` inside `directory`.
+    '''
+    return os.path.join(directory, 'patterns-%s-%d-v%d.npy' % (digest[:16], word_length, PATTERN_VERSION))
+
+
+def write_pattern_matrix(path, patterns):
+    '''
+    Atomically saves `patterns` as a .npy file at `path`.
+    '''
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, patterns)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_pattern_matrix(path, count=None, word_length=None):
+    '''
+    Memory-maps the pattern matrix at `path`. Returns None if it is
+    missing or unreadable, or if it is not a `count` x `count` matrix
+    of the pattern dtype for `word_length` when those are given.
+    '''
+    try:
+        patterns = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if patterns.ndim != 2 or patterns.shape[0] != patterns.shape[1]:
+        return None
+    if count is not None and patterns.shape[0] != count:
+        return None
+    if word_length is not None and patterns.dtype != pattern_dtype(word_length):
+        return None
+    return patterns
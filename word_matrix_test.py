@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+    import word_matrix
+except ImportError:
+    numpy = word_matrix = None
+
+
+@unittest.skipIf(word_matrix is None, 'NumPy is not installed')
+class TestWordMatrixMethods(unittest.TestCase):
+    def test_create_word_matrix(self):
+        matrix = word_matrix.create_word_matrix(b'abcZYX', 3)
+        self.assertEqual(matrix.tolist(), [[0, 1, 2], [25, 24, 23]])
+        self.assertEqual(word_matrix.create_word_matrix(b'', 5).shape, (0, 5))
+
+    def test_filter_word_matrix_duplicate_letters(self):
+        words = ['HELLO', 'LLAMA', 'LEVEL', 'ALLOT', 'SALLY']
+        matrix = word_matrix.create_word_matrix(''.join(words).encode('ascii'), 5)
+        # Two L's marked and none rejected: at least two L's, neither at positions 0 or 1
+        self.assertEqual(word_matrix.filter_word_matrix(matrix, 'LLAMA', '??XXX').tolist(), [0])
+        # One L found and one rejected: exactly one L
+        self.assertEqual(word_matrix.filter_word_matrix(matrix, 'HILLY', 'XX?XX').tolist(), [])
+        self.assertEqual(word_matrix.filter_word_matrix(matrix, 'LEVEL', 'OOOOO').tolist(), [2])
+        indices = word_matrix.filter_word_matrix(matrix, 'SOLLY', 'XX??X')
+        self.assertEqual(indices.tolist(), [1, 2])
+        self.assertEqual(word_matrix.filter_word_matrix(matrix, 'LEVEL', 'OOOOO', indices).tolist(), [2])
+        with self.assertRaises(ValueError):
+            word_matrix.filter_word_matrix(matrix, 'HELLO', 'OOOO!')
+
+    def test_score_words(self):
+        words = ['CABAL', 'CABLE', 'TABLE']
+        matrix = word_matrix.create_word_matrix(''.join(words).encode('ascii'), 5)
+        self.assertEqual(word_matrix.letter_position_counts(matrix, [0, 1])[3].tolist()[:12],
+                         [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(word_matrix.first_occurrences(matrix)[0].tolist(), [True, True, True, False, True])
+        self.assertEqual(word_matrix.letter_presence_counts(matrix)[0], 3)
+        # CABAL: C 2 + A 3 + B 3 + A 1 + L 1
+        self.assertEqual(word_matrix.score_words(matrix).tolist(), [10, 12, 11])
+        # CABAL: C 2 + A 3 + B 3 + L 3, its second A counts once
+        self.assertEqual(word_matrix.score_words(matrix, 'presence').tolist(), [11, 13, 12])
+        self.assertEqual(word_matrix.score_words(matrix, 'position_presence', [2]).tolist(), [5, 8, 10])
+        self.assertEqual(word_matrix.top_indices(numpy.array([3, 5, 5, 1]), 2).tolist(), [1, 2])
+        self.assertEqual(word_matrix.top_indices(numpy.array([3, 5, 5, 1]), 9).tolist(), [1, 2, 0, 3])
+        self.assertEqual(word_matrix.top_indices(numpy.array([1, 1, 1]), 1).tolist(), [0])
+
+    def test_pattern_codes(self):
+        self.assertEqual(word_matrix.pattern_dtype(5), numpy.uint8)
+        self.assertEqual(word_matrix.pattern_dtype(6), numpy.uint16)
+        self.assertEqual(word_matrix.pattern_code('XXXXX'), 0)
+        self.assertEqual(word_matrix.pattern_code('?XXXX'), 1)
+        self.assertEqual(word_matrix.pattern_code('XO'), 6)
+        self.assertEqual(word_matrix.pattern_response(word_matrix.pattern_code('?O?XX'), 5), '?O?XX')
+        with self.assertRaises(ValueError):
+            word_matrix.pattern_code('XXXX!')
+
+    def test_create_pattern_matrix(self):
+        words = ['HILLY', 'LIGHT', 'LLAMA', 'HELLO', 'EERIE', 'THREE']
+        matrix = word_matrix.create_word_matrix(''.join(words).encode('ascii'), 5)
+        patterns = word_matrix.create_pattern_matrix(matrix, matrix)
+        self.assertEqual(patterns.shape, (6, 6))
+        self.assertEqual(patterns.dtype, numpy.uint8)
+        responses = {(words[g], words[a]): word_matrix.pattern_response(patterns[g, a], 5)
+                     for g in range(6) for a in range(6)}
+        self.assertEqual(responses['HILLY', 'LIGHT'], '?O?XX')
+        self.assertEqual(responses['LLAMA', 'HELLO'], '??XXX')
+        self.assertEqual(responses['HELLO', 'LLAMA'], 'XX??X')
+        self.assertEqual(responses['EERIE', 'THREE'], '?XOXO')
+        self.assertEqual(responses['THREE', 'EERIE'], 'XXO?O')
+        self.assertEqual(responses['EERIE', 'EERIE'], 'OOOOO')
+
+    def test_partition_statistics(self):
+        matrix = word_matrix.create_word_matrix(b'FIGHTLIGHTMIGHTOPERA', 5)
+        patterns = word_matrix.create_pattern_matrix(matrix, matrix)
+        statistics = word_matrix.partition_statistics(patterns, 5)
+        # OPERA splits the words 3-1, each IGHT word 2-1-1
+        self.assertEqual(statistics['max_size'].tolist(), [2, 2, 2, 3])
+        self.assertEqual(statistics['expected_size'].tolist(), [1.5, 1.5, 1.5, 2.5])
+        self.assertAlmostEqual(statistics['entropy'][0], 1.5)
+        statistics = word_matrix.partition_statistics(patterns, 5, [0, 1])
+        self.assertEqual(statistics['max_size'].tolist(), [1, 1, 2, 2])
+        self.assertEqual(word_matrix.best_guess(-statistics['max_size'], [1]), 1)
+        self.assertEqual(word_matrix.best_guess(statistics['entropy']), 0)
+
+    def test_pattern_matrix_file(self):
+        matrix = word_matrix.create_word_matrix(b'HILLYLIGHTLLAMA', 5)
+        patterns = word_matrix.create_pattern_matrix(matrix, matrix)
+        with tempfile.TemporaryDirectory() as directory:
+            path = word_matrix.pattern_matrix_path(directory, 'ab' * 32, 5)
+            self.assertIsNone(word_matrix.load_pattern_matrix(path))
+            word_matrix.write_pattern_matrix(path, patterns)
+            self.assertEqual(os.listdir(directory), [os.path.basename(path)])
+            loaded = word_matrix.load_pattern_matrix(path, 3, 5)
+            self.assertIsInstance(loaded, numpy.memmap)
+            self.assertEqual(loaded.tolist(), patterns.tolist())
+            self.assertIsNone(word_matrix.load_pattern_matrix(path, 4, 5))
+            self.assertIsNone(word_matrix.load_pattern_matrix(path, 3, 6))
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+'''
+Fixed-width word packs: a cache artifact holding every word of one
+length from one dictionary as a single contiguous block of records.
+
+A pack file is a 56-byte little-endian header followed by the words:
+
+magic         8 bytes   b'WORDPACK'
+version       uint32    VERSION
+word_length   uint32    letters per word (L)
+count         uint32    number of words (N)
+reserved      uint32
+digest        32 bytes  SHA-256 of the dictionary (twl.dictionary_digest)
+words         N*L bytes uppercase ASCII, sorted, no separators
+
+Packs are loaded with mmap, so loading costs a few system calls and
+the words can be viewed without copying, either as a memoryview of
+shape (N, L) or as a NumPy (N, L) uint8 matrix.
+
+Sample usage:
+
+>>> write_word_pack('words5.pack', ['HELLO', 'WORLD'], 5)
+>>> pack = load_word_pack('words5.pack')
+>>> pack.words()
+['HELLO', 'WORLD']
+'''
+
+import mmap
+import os
+import struct
+import tempfile
+
+MAGIC = b'WORDPACK'
+VERSION = 1
+HEADER = struct.Struct('<8sIIII32s')
+
+
+class WordPack(object):
+    '''
+    A loaded word pack. `buffer` is a read-only memoryview of the words,
+    `count` * `word_length` bytes long.
+    '''
+    def __init__(self, buffer, word_length, count, digest):
+        self.buffer = buffer
+        self.word_length = word_length
+        self.count = count
+        self.digest = digest
+    def __len__(self):
+        return self.count
+    def words(self):
+        '''
+        Returns the words as a list of strings.
+        '''
+        text = str(self.buffer, 'ascii')
+        length = self.word_length
+        return [text[i:i + length] for i in range(0, len(text), length)]
+    def as_memoryview(self):
+        '''
+        Returns a zero-copy (N, L) memoryview of unsigned bytes.
+        '''
+        return self.buffer.cast('B', [self.count, self.word_length])
+    def as_numpy(self):
+        '''
+        Returns a zero-copy, read-only (N, L) NumPy uint8 matrix.
+        NumPy is only imported here, so loading a pack never pays for it.
+        '''
+        import numpy as np
+        return np.frombuffer(self.buffer, dtype=np.uint8).reshape(self.count, self.word_length)
+
+
+def word_pack_path(directory, digest, word_length):
+    '''
+    Returns the path of the pack for the dictionary with hex `digest`
+    and `word_length` inside `directory`.
+    '''
+    return os.path.join(directory, 'words-%s-%d-v%d.pack' % (digest[:16], word_length, VERSION))
+
+
+def write_word_pack(path, words, word_length, digest=''):
+    '''
+    Atomically writes `words` to a pack at `path`, uppercased and
+    sorted. `digest` is the hex digest of the source dictionary.
+    '''
+    words = sorted(set(word.upper() for word in words))
+    for word in words:
+        if len(word) != word_length:
+            raise ValueError('Invalid string length for word {}'.format(word))
+    payload = ''.join(words).encode('ascii')
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, word_length, len(words), 0, bytes.fromhex(digest)))
+            f.write(payload)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_word_pack(path, digest=None, word_length=None):
+    '''
+    Memory-maps the pack at `path`. Returns None if it is missing,
+    truncated or from another version, or if it does not match the
+    expected hex `digest` or `word_length` when those are given.
+    '''
+    try:
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(buf)
+    if len(view) < HEADER.size:
+        return None
+    magic, version, length, count, _, stored_digest = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION or len(view) != HEADER.size + length * count:
+        return None
+    if digest is not None and stored_digest != bytes.fromhex(digest):
+        return None
+    if word_length is not None and length != word_length:
+        return None
+    return WordPack(view[HEADER.size:], length, count, stored_digest.hex())
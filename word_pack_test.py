@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+import word_pack
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestWordPackMethods(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'words.pack')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_write_and_load_word_pack(self):
+        digest = 'ab' * 32
+        word_pack.write_word_pack(self.path, ['world', 'HELLO', 'hello'], 5, digest)
+        pack = word_pack.load_word_pack(self.path, digest, 5)
+        self.assertEqual(len(pack), 2)
+        self.assertEqual(pack.words(), ['HELLO', 'WORLD'])
+        self.assertEqual(pack.digest, digest)
+        self.assertEqual(pack.as_memoryview()[1, 0], ord('W'))
+        self.assertIsNone(word_pack.load_word_pack(self.path, 'cd' * 32))
+        self.assertIsNone(word_pack.load_word_pack(self.path, digest, 4))
+        self.assertIsNone(word_pack.load_word_pack(os.path.join(self.directory.name, 'missing.pack')))
+        with self.assertRaises(ValueError):
+            word_pack.write_word_pack(self.path, ['four'], 5)
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_as_numpy(self):
+        word_pack.write_word_pack(self.path, ['HELLO', 'WORLD'], 5)
+        matrix = word_pack.load_word_pack(self.path).as_numpy()
+        self.assertEqual(matrix.shape, (2, 5))
+        self.assertEqual(bytes(matrix[1]), b'WORLD')
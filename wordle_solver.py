@@ -1,11 +1,42 @@
 import argparse
+import collections
+import hashlib
 import heapq
+import operator
+import os
 
 import twl
+import word_bitset
+import word_pack
 
 parser = argparse.ArgumentParser(description='A Wordle puzzle solver.')
 parser.add_argument("-w", "--word_length", type=int, help="Set word length", default=5)
 parser.add_argument("-n", "--num_attempts", type=int, help="Set number of attempts", default=6)
+parser.add_argument("-p", "--pack_dir", help="Set directory of cached word packs and pattern matrices", default=None)
+parser.add_argument("-s", "--strategy", choices=['frequency', 'entropy', 'minimax', 'expected_size'],
+                    help="Set strategy used to pick attempts. Strategies other than frequency compute a pattern "
+                         "matrix, which takes seconds for 5 letters and is only kept between runs with --pack_dir",
+                    default='frequency')
+parser.add_argument("-e", "--engine", choices=['set', 'numpy', 'bitset'],
+                    help="Set engine used to filter possible words", default='set')
+
+
+# The "closeness to answer" response Wordle gives for an attempt. A repeated letter is only marked misplaced (?)
+# as many times as the answer has copies of it left over after the correct (O) letters are matched
+# O(word_length)
+def create_attempt_response(attempt, answer) -> str:
+    response = ['X'] * len(answer)
+    unmatched_letters = {}
+    for i in range(len(answer)):
+        if attempt[i] == answer[i]:
+            response[i] = 'O'
+        else:
+            unmatched_letters[answer[i]] = unmatched_letters.get(answer[i], 0) + 1
+    for i in range(len(answer)):
+        if response[i] != 'O' and unmatched_letters.get(attempt[i], 0) > 0:
+            unmatched_letters[attempt[i]] -= 1
+            response[i] = '?'
+    return ''.join(response)
 
 
 # The Wordle class defining a puzzle, console UI, and a basic way to get input from the user
@@ -19,7 +50,9 @@ class Wordle:
         self.correct_response = ''.join(['O' for _ in range(word_length)])
 
     def make_attempt_with_input(self) -> None:
-        self.make_attempt(input('Please input a word attempt!\n'))
+        attempt_word = input('Please input a word attempt!\n')
+        self._validate_dictionary_word(attempt_word)
+        self.make_attempt(attempt_word)
 
     def make_attempt(self, attempt_word) -> None:
         self._validate_word(attempt_word)
@@ -27,16 +60,8 @@ class Wordle:
         self._pretty_print_attempts()
 
     # Automatically respond with "closeness to answer"
-    def get_automated_attempt_response(self, answer):
-        response = ''
-        for i in range(len(answer)):
-            if self.attempts[-1][i] == answer[i]:
-                response += 'O'
-            elif self.attempts[-1][i] in answer:
-                response += '?'
-            else:
-                response += 'X'
-        self.get_attempt_response(response)
+    def get_automated_attempt_response(self, answer) -> str:
+        return self.get_attempt_response(create_attempt_response(self.attempts[-1], answer))
 
     # Prompt user for the "closeness to answer" response to the solver's attempt
     def get_user_attempt_response(self) -> str:
@@ -82,6 +107,17 @@ class Wordle:
         if len(word) != self.word_length:
             raise ValueError('Invalid string length for response')
 
+    # Walk a dictionary cursor one letter at a time, so an invalid attempt is reported at the first letter no
+    # word continues with. O(word_length)
+    def _validate_dictionary_word(self, word) -> None:
+        self._validate_word(word)
+        cursor = twl.cursor()
+        for i in range(len(word)):
+            if not cursor.advance(word[i].lower()):
+                raise ValueError('No word starts with {}'.format(word[:i + 1].upper()))
+        if not cursor.is_word:
+            raise ValueError('{} is not a word'.format(word.upper()))
+
     def _pretty_print_attempts(self):
         for attempt in range(self.num_attempts):
             for char in range(self.word_length):
@@ -99,12 +135,63 @@ class Wordle:
         print()
 
 
+# Letters are coded 0 for A through 25 for Z in freq tables
+LETTER_CODES = bytes.maketrans(bytes(range(ord('A'), ord('Z') + 1)) + bytes(range(ord('a'), ord('z') + 1)),
+                               bytes(range(26)) * 2)
+
+
 def get_letter_position_freq_dict_key(word, i) -> str:
     return word[i] + str(i)
 
 
-# O(num_words*num_length)
+# Letter position frequencies as a word_length x 26 table, freq_table[i][code] being the number of words with the
+# letter of that code at position i, whatever the case of the letter. Each position is counted with one Counter pass
+# over its column of letters, instead of building and hashing a string key for every letter. O(num_words*num_length)
+def create_letter_position_freq_table(words, word_length) -> list:
+    freq_table = [[0] * 26 for _ in range(word_length)]
+    for i, column in enumerate(zip(*words)):
+        for letter, count in collections.Counter(column).items():
+            freq_table[i][ord(letter.upper()) - ord('A')] += count
+    return freq_table
+
+
+# Turn the freq table of some words into that of remaining_words, those left after a response, either by subtracting
+# eliminated_words, the others, or by rebuilding it from the remaining ones, whichever counts fewer words. The filter
+# steps hand over both, so neither is derived from the other here. The table may be updated in place, use the one
+# returned. O(min(num_eliminated, num_remaining)*num_length)
+def update_letter_position_freq_table(freq_table, remaining_words, eliminated_words) -> list:
+    if len(eliminated_words) >= len(remaining_words):
+        return create_letter_position_freq_table(remaining_words, len(freq_table))
+    for i, column in enumerate(zip(*eliminated_words)):
+        for letter, count in collections.Counter(column).items():
+            freq_table[i][ord(letter.upper()) - ord('A')] -= count
+    return freq_table
+
+
+def freq_table_to_dict(freq_table) -> dict:
+    freq_dict = {}
+    for i in range(len(freq_table)):
+        for code in range(26):
+            if freq_table[i][code]:
+                freq_dict[chr(ord('A') + code) + str(i)] = freq_table[i][code]
+    return freq_dict
+
+
+# Reads only the keys an uppercase word of word_length letters can have, as scoring words against the dict did, so other
+# keys, such as 'S5' for 5 letters, '$0' or lowercase 'a0', count for nothing. O(num_length)
+def freq_dict_to_table(freq_dict, word_length) -> list:
+    return [[freq_dict.get(chr(ord('A') + code) + str(i), 0) for code in range(26)] for i in range(word_length)]
+
+
+# The freq table in the dict form keyed by get_letter_position_freq_dict_key, without letters no word has there.
+# Words that are not all uppercase A-Z words of one length are counted key by key instead, keeping their letters as
+# they are. O(num_words*num_length)
 def create_letter_position_freq_dict(words):
+    words = list(words)
+    word_length = len(words[0]) if words else 0
+    text = ''.join(words)
+    if text.isascii() and text.isalpha() and text.isupper() and all(len(word) == word_length for word in words):
+        return freq_table_to_dict(create_letter_position_freq_table(words, word_length))
     freq_dict = {}
     for word in words:
         for i in range(len(word)):
@@ -113,37 +200,242 @@ def create_letter_position_freq_dict(words):
     return freq_dict
 
 
+# Everything the responses so far reveal about the answer, in the form twl.search expects, so possible words can be
+# found by walking the dictionary instead of filtering a materialized word set
+class WordleConstraints:
+    def __init__(self, word_length):
+        self.word_length = word_length
+        # Position -> correct (O/green) letter
+        self.fixed = {}
+        # Position -> set of letters that are not at that position
+        self.forbidden = {}
+        # Letter -> minimum number of times it appears
+        self.required = {}
+        # Letters with no more copies than self.required says (none if not required)
+        self.excluded = set()
+
+    def add_response(self, attempt: str, response: str) -> None:
+        assert len(attempt) == len(response)
+        attempt = attempt.upper()
+        found_counts = {}
+        for i in range(len(response)):
+            if response[i] in 'O?':
+                found_counts[attempt[i]] = found_counts.get(attempt[i], 0) + 1
+        for i in range(len(response)):
+            if response[i] == 'O':
+                self.fixed[i] = attempt[i]
+            elif response[i] == '?':
+                self.forbidden.setdefault(i, set()).add(attempt[i])
+            elif response[i] == 'X':
+                self.forbidden.setdefault(i, set()).add(attempt[i])
+                self.excluded.add(attempt[i])
+            else:
+                raise ValueError('Invalid character in received response')
+        for letter, count in found_counts.items():
+            self.required[letter] = max(self.required.get(letter, 0), count)
+
+    # O(num_matching_prefixes), independent of the size of the dictionary
+    def search(self) -> set:
+        return set(word.upper() for word in twl.search(
+            self.word_length,
+            fixed={i: letter.lower() for i, letter in self.fixed.items()},
+            forbidden={i: {letter.lower() for letter in letters} for i, letters in self.forbidden.items()},
+            required={letter.lower(): count for letter, count in self.required.items()},
+            excluded={letter.lower() for letter in self.excluded}))
+
+
+# Split a buffer of fixed-width words, as returned by twl.words_by_length, into uppercase words.
+# The whole buffer is decoded and uppercased at once instead of word by word. O(num_words*word_length)
+def split_word_buffer(words, word_length) -> list:
+    text = str(words, 'ascii').upper()
+    return [text[i:i + word_length] for i in range(0, len(text), word_length)]
+
+
+# Load the buffer of word_length-letter words from the word pack in pack_dir if it is there, otherwise walk the
+# dictionary and write the pack so the next start can skip the walk
+def load_word_buffer(word_length, pack_dir=None):
+    if pack_dir is None:
+        return twl.words_by_length([word_length])[word_length]
+    digest = twl.dictionary_digest()
+    path = word_pack.word_pack_path(pack_dir, digest, word_length)
+    pack = word_pack.load_word_pack(path, digest, word_length)
+    if pack is not None:
+        return pack.buffer
+    words = twl.words_by_length([word_length])[word_length]
+    try:
+        os.makedirs(pack_dir, exist_ok=True)
+        word_pack.write_word_pack(path, split_word_buffer(words, word_length), word_length, digest)
+    except OSError:
+        print('Warning: Could not write word pack to {}'.format(path))
+    return words
+
+
+# word_matrix needs NumPy, which takes longer to import than the rest of the solver, so it is only imported by the
+# features that use it: the numpy engine, vectorized scoring and the partition strategies
+def import_word_matrix(feature):
+    try:
+        import word_matrix
+    except ImportError:
+        raise ValueError('{} requires NumPy'.format(feature))
+    return word_matrix
+
+
+# Load the guess x answer pattern matrix of the words in a fixed-width word buffer from pack_dir if it is there,
+# otherwise compute it, which takes seconds for 5 letters, and save it there so the next process can memory-map it.
+# Files are keyed by the digest of the uppercased buffer, so solvers over custom word lists never share one, while the
+# lowercase buffer of a dictionary walk and the uppercase one of a word pack of the same words do
+def load_pattern_matrix(words, word_length, pack_dir=None):
+    word_matrix = import_word_matrix('The pattern matrix')
+    matrix = word_matrix.create_word_matrix(words, word_length)
+    if pack_dir is None:
+        return word_matrix.create_pattern_matrix(matrix, matrix)
+    path = word_matrix.pattern_matrix_path(pack_dir, hashlib.sha256(bytes(words).upper()).hexdigest(), word_length)
+    patterns = word_matrix.load_pattern_matrix(path, len(matrix), word_length)
+    if patterns is not None:
+        return patterns
+    patterns = word_matrix.create_pattern_matrix(matrix, matrix)
+    try:
+        os.makedirs(pack_dir, exist_ok=True)
+        word_matrix.write_pattern_matrix(path, patterns)
+    except OSError:
+        print('Warning: Could not write pattern matrix to {}'.format(path))
+    return patterns
+
+
+# Strategies that pick the attempt whose responses split the possible words best, as scores over the statistics of
+# word_matrix.partition_statistics. The highest score wins
+PARTITION_STRATEGY_SCORES = {
+    # Most information expected
+    'entropy': lambda statistics: statistics['entropy'],
+    # Fewest possible words left in the worst case
+    'minimax': lambda statistics: -statistics['max_size'],
+    # Fewest possible words left on average
+    'expected_size': lambda statistics: -statistics['expected_size'],
+}
+
+
 # The automated solver that will solve a given Wordle
 class WordleSolver:
-    def __init__(self, word_length, num_attempts):
+    # words: optional buffer of fixed-width words of word_length letters. Services running solvers for several lengths
+    # can build them all in one dictionary pass with twl.words_by_length and share the buffers between instances
+    # pack_dir: optional directory of word packs and pattern matrices, used instead of walking the dictionary or
+    # computing patterns when they are there
+    # engine: 'set' filters sets of words in Python, 'numpy' filters index arrays over self.word_matrix,
+    # 'bitset' filters int bitsets with self.word_bitsets
+    def __init__(self, word_length, num_attempts, words=None, pack_dir=None, engine='set'):
+        if engine not in ('set', 'numpy', 'bitset'):
+            raise ValueError('Invalid engine {}'.format(engine))
+        if engine == 'numpy':
+            import_word_matrix('The numpy engine')
         self.word_length = word_length
         self.num_attempts = num_attempts
-        self.filtered_words_by_length = set(word.upper() for word in twl.iterator() if len(word) == word_length)
+        self.engine = engine
+        self.pack_dir = pack_dir
+        if words is None:
+            words = load_word_buffer(word_length, pack_dir)
+        self.word_buffer = words
+        # Sorted, so row i of self.word_matrix and of self.pattern_matrix is self.word_list[i]
+        self.word_list = split_word_buffer(words, word_length)
+        self.filtered_words_by_length = set(self.word_list)
+        self.word_ids = {word: i for i, word in enumerate(self.word_list)}
+        # Letter codes of each word, as indexes into the rows of a freq table
+        codes = bytes(words).translate(LETTER_CODES)
+        self.word_codes = [codes[i:i + word_length] for i in range(0, len(codes), word_length)]
+        # Built up front for the numpy engine, on first use by score_words otherwise
+        self.word_matrix = None
+        if engine == 'numpy':
+            self.get_word_matrix()
+        self.word_bitsets = word_bitset.WordBitsetIndex(self.word_list) if engine == 'bitset' else None
+        self.pattern_matrix = None
+        self.opening_statistics = None
         self.not_contained_letters = set()
         print("{} potential words".format(len(self.filtered_words_by_length)))
 
+    # freq: a freq table, or a freq dict as from create_letter_position_freq_dict
     # O(num_words*num_length)
-    def get_best_freq_score_word(self, freq_dict: dict) -> str:
-        freq_word_tuple = self.create_word_freq_score_heap(freq_dict)[0]
-        # Tuple: (-freq_score, word). Sample tuple: (-7824, 'SORES')
-        return freq_word_tuple[1]
+    def get_best_freq_score_word(self, freq) -> str:
+        return self.top_guesses(1, freq)[0]
 
-    def create_word_freq_score_heap(self, freq_dict: dict) -> list:
-        if not freq_dict:
+    # Freq score of each word of self.word_list: the sum of the frequencies of its letters at their positions
+    # O(num_words*num_length)
+    def get_freq_scores(self, freq) -> list:
+        freq_table = freq_dict_to_table(freq, self.word_length) if isinstance(freq, dict) else freq
+        if not any(any(counts) for counts in freq_table):
             print('Warning: There is no freq_dict defined, so freq_score_heap is completely randomized')
-        freq_word_tuples = []
-        for word in self.filtered_words_by_length:
-            freq_score = 0
-            for i in range(len(word)):
-                key = get_letter_position_freq_dict_key(word, i)
-                freq_score += freq_dict.get(key, 0)
-            freq_word_tuples.append((-freq_score, word))
+        # Sum of freq_table[i][codes[i]] over the positions i, without a Python loop per letter
+        return [sum(map(list.__getitem__, freq_table, codes)) for codes in self.word_codes]
+
+    def create_word_freq_score_heap(self, freq) -> list:
+        freq_word_tuples = [(-freq_score, word) for freq_score, word in zip(self.get_freq_scores(freq), self.word_list)]
         heapq.heapify(freq_word_tuples)
         return freq_word_tuples
 
+    # The k words with the highest freq scores, best first, keeping only the best k seen so far instead of ordering
+    # every word. Ties go to the word that comes first alphabetically, as in the heap. freq defaults to the freq table
+    # of every word. O(num_words*num_length + num_words*log(k))
+    def top_guesses(self, k, freq=None) -> list:
+        if freq is None:
+            freq = create_letter_position_freq_table(self.word_list, self.word_length)
+        freq_word_tuples = zip(map(operator.neg, self.get_freq_scores(freq)), self.word_list)
+        return [word for _, word in heapq.nsmallest(k, freq_word_tuples)]
+
+    # Vectorized get_freq_scores over self.word_matrix, scoring every word against the freq tables of the possible words
+    # (indices into self.word_list, None for every word) with a weighting from word_matrix.SCORE_WEIGHTINGS
+    # O(num_words*num_length) in NumPy
+    def score_words(self, possible_indices=None, weighting='position'):
+        word_matrix = import_word_matrix('Vectorized scoring')
+        return word_matrix.score_words(self.get_word_matrix(), weighting, possible_indices)
+
+    # Yield the words from the highest freq score down, in the order of top_guesses. Only the words taken are ordered,
+    # O(num_words*num_length) to start and O(log(num_words)) per word
+    def iter_guesses(self, freq=None):
+        if freq is None:
+            freq = create_letter_position_freq_table(self.word_list, self.word_length)
+        freq_score_heap = self.create_word_freq_score_heap(freq)
+        while freq_score_heap:
+            yield heapq.heappop(freq_score_heap)[1]
+
+    # Partition statistics of every word as an attempt against the possible words (indices into self.word_list, None
+    # for every word). Those of the first attempt are the same every game, so they are kept and shared between
+    # strategies. O(num_words*num_possible_words) in NumPy
+    def get_partition_statistics(self, possible_indices=None) -> dict:
+        if possible_indices is None and self.opening_statistics is not None:
+            return self.opening_statistics
+        word_matrix = import_word_matrix('The partition strategies')
+        statistics = word_matrix.partition_statistics(self.get_pattern_matrix(), self.word_length, possible_indices)
+        if possible_indices is None:
+            self.opening_statistics = statistics
+        return statistics
+
+    # Pick the attempt with the best score under one of PARTITION_STRATEGY_SCORES. Every word is a potential attempt
+    def get_best_partition_word(self, possible_indices=None, strategy='entropy') -> str:
+        if possible_indices is not None and len(possible_indices) == 1:
+            return self.word_list[possible_indices[0]]
+        word_matrix = import_word_matrix('The partition strategies')
+        scores = PARTITION_STRATEGY_SCORES[strategy](self.get_partition_statistics(possible_indices))
+        return self.word_list[word_matrix.best_guess(scores, possible_indices)]
+
     # Filter eliminated words using response consisting of not contained letters and misplaced letters
     # O(num_words*word_length)
     def parse_response_and_filter(self, words: set, attempt: str, response: str) -> set:
+        letters = self._parse_response(attempt, response)
+        return set(filter(lambda word: self._filter_eliminated_words(word, *letters), words))
+
+    # parse_response_and_filter that also returns the list of the eliminated words, from the same pass over words
+    # O(num_words*word_length)
+    def parse_response_and_split(self, words: set, attempt: str, response: str) -> tuple:
+        letters = self._parse_response(attempt, response)
+        remaining_words = set()
+        eliminated_words = []
+        for word in words:
+            if self._filter_eliminated_words(word, *letters):
+                remaining_words.add(word)
+            else:
+                eliminated_words.append(word)
+        return remaining_words, eliminated_words
+
+    # The correct letters by index, misplaced letters by index and not contained letters of a response
+    def _parse_response(self, attempt: str, response: str) -> tuple:
         assert len(attempt) == len(response)
         correct_letters_by_index = {}
         misplaced_letters_by_index = {}
@@ -157,10 +449,7 @@ class WordleSolver:
                 correct_letters_by_index[i] = attempt[i]
             else:
                 raise ValueError('Invalid character in received response')
-        return set(filter(
-            lambda word: self._filter_eliminated_words(
-                word, correct_letters_by_index, misplaced_letters_by_index, uncontained_letters),
-            words))
+        return correct_letters_by_index, misplaced_letters_by_index, uncontained_letters
 
     def _filter_eliminated_words(self, word: str, correct_letters: dict, misplaced_letters: dict,
                                  uncontained_letters: set) -> bool:
@@ -191,25 +480,97 @@ class WordleSolver:
             return False
         return True
 
-    def solve(self, answer=None) -> bool:
+    # Vectorized parse_response_and_filter for the numpy engine. Takes and returns sorted arrays of indices into
+    # self.word_list (None for every word) instead of sets of words. O(num_words*word_length) in NumPy
+    def parse_response_and_filter_indices(self, indices, attempt: str, response: str):
+        word_matrix = import_word_matrix('The numpy engine')
+        return word_matrix.filter_word_matrix(self.get_word_matrix(), attempt.upper(), response.upper(), indices)
+
+    # parse_response_and_filter for the bitset engine. Takes and returns int bitsets over the indices of self.word_list
+    # O(word_length) big int operations of num_words bits
+    def parse_response_and_filter_bits(self, bits: int, attempt: str, response: str) -> int:
+        return self.word_bitsets.filter(bits, attempt.upper(), response.upper())
+
+    # The letter matrix of self.word_list, built on first use
+    def get_word_matrix(self):
+        if self.word_matrix is None:
+            word_matrix = import_word_matrix('The word matrix')
+            self.word_matrix = word_matrix.create_word_matrix(self.word_buffer, self.word_length)
+        return self.word_matrix
+
+    # The pattern matrix of self.word_list against itself, loaded or computed on first use
+    def get_pattern_matrix(self):
+        if self.pattern_matrix is None:
+            self.pattern_matrix = load_pattern_matrix(self.word_buffer, self.word_length, self.pack_dir)
+        return self.pattern_matrix
+
+    # Find the words consistent with every (attempt, response) pair straight from the dictionary,
+    # without filtering self.filtered_words_by_length. The dictionary may hold words the solver was not given
+    # with words=, so only the matches that are also among the solver's words are kept. O(num_matching_prefixes)
+    def search_possible_words(self, attempts: list, responses: list) -> set:
+        constraints = WordleConstraints(self.word_length)
+        for attempt, response in zip(attempts, responses):
+            constraints.add_response(attempt, response)
+        return constraints.search() & self.filtered_words_by_length
+
+    # strategy: 'frequency' picks the word with the highest letter position frequency score, the others are
+    # PARTITION_STRATEGY_SCORES (need NumPy)
+    def solve(self, answer=None, strategy='frequency') -> bool:
+        if strategy != 'frequency' and strategy not in PARTITION_STRATEGY_SCORES:
+            raise ValueError('Invalid strategy {}'.format(strategy))
         wordle = Wordle(self.word_length, self.num_attempts)
         possible_words = self.filtered_words_by_length
+        possible_indices = None
+        possible_bits = self.word_bitsets.all_words() if self.engine == 'bitset' else None
+        # Kept in step with possible_words, see update_letter_position_freq_table
+        freq_table = None
         # Taking most expensive parts of what's in this loop, 
         # the time complexity of WordleSolver.solve is O(num_words*word_length*num_attempts)
         for attempt in range(self.num_attempts):
-            freq_dict = create_letter_position_freq_dict(possible_words)
-            next_word = self.get_best_freq_score_word(freq_dict)
+            if strategy == 'frequency' and self.engine == 'numpy':
+                top_indices = import_word_matrix('The numpy engine').top_indices
+                next_word = self.word_list[top_indices(self.score_words(possible_indices), 1)[0]]
+            elif strategy == 'frequency':
+                if freq_table is None:
+                    freq_table = create_letter_position_freq_table(possible_words, self.word_length)
+                next_word = self.get_best_freq_score_word(freq_table)
+            else:
+                next_word = self.get_best_partition_word(possible_indices, strategy)
             wordle.make_attempt(next_word)
             response = wordle.get_user_attempt_response() if answer is None else wordle.get_automated_attempt_response(
                 answer)
             if wordle.is_solved():
                 return True
-            possible_words = self.parse_response_and_filter(possible_words, next_word, response)
+            # The words the response eliminates, for the freq table
+            eliminated_words = None
+            if self.engine == 'numpy':
+                # The candidates stay an index array, this engine neither keeps possible_words nor a freq table
+                possible_indices = self.parse_response_and_filter_indices(possible_indices, next_word, response)
+                print("{} possible words left".format(len(possible_indices)))
+                continue
+            if self.engine == 'bitset':
+                remaining_bits = self.parse_response_and_filter_bits(possible_bits, next_word, response)
+                possible_indices = self.word_bitsets.ids(remaining_bits)
+                remaining_words = [self.word_list[i] for i in possible_indices]
+                if freq_table is not None:
+                    eliminated_words = self.word_bitsets.words(possible_bits & ~remaining_bits)
+                possible_bits = remaining_bits
+            else:
+                remaining_words, eliminated_words = self.parse_response_and_split(possible_words, next_word, response)
+                if strategy != 'frequency':
+                    possible_indices = sorted(self.word_ids[word] for word in remaining_words)
+            if freq_table is not None:
+                freq_table = update_letter_position_freq_table(freq_table, remaining_words, eliminated_words)
+            possible_words = remaining_words
             print("{} possible words left".format(len(possible_words)))
         return False
 
 
 if __name__ == '__main__':
     args = parser.parse_args()
-    wordle_solver = WordleSolver(args.word_length, args.num_attempts)
-    wordle_solver.solve()
+    if args.strategy != 'frequency' and args.pack_dir is None:
+        print('Warning: No --pack_dir set, the pattern matrix of the {} strategy is computed again every run'.format(
+            args.strategy))
+    wordle_solver = WordleSolver(args.word_length, args.num_attempts, pack_dir=args.pack_dir,
+                                 engine=args.engine)
+    wordle_solver.solve(strategy=args.strategy)
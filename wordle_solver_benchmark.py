@@ -0,0 +1,86 @@
+import argparse
+import contextlib
+import io
+
+import wordle_solver as ws
+from twl_benchmark import best_time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+parser = argparse.ArgumentParser(description='Per-turn benchmarks for the Wordle solver.')
+parser.add_argument("-r", "--repeat", type=int, help="Set number of timed runs per case", default=3)
+parser.add_argument("-w", "--word_length", type=int, help="Set word length", default=5)
+parser.add_argument("-a", "--answers", type=int, help="Set number of answers played", default=50)
+
+
+# The (possible words, attempt, response, remaining words) of each turn of a game played with the frequency strategy
+def play_turns(solver, answer):
+    possible_words = solver.filtered_words_by_length
+    for _ in range(solver.num_attempts):
+        freq_table = ws.create_letter_position_freq_table(possible_words, solver.word_length)
+        attempt = solver.get_best_freq_score_word(freq_table)
+        response = ws.create_attempt_response(attempt, answer)
+        if response == 'O' * solver.word_length:
+            return
+        remaining_words = solver.parse_response_and_filter(possible_words, attempt, response)
+        yield possible_words, attempt, response, remaining_words
+        possible_words = remaining_words
+
+
+def mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def run_turn_benchmarks(word_length, num_answers, repeat):
+    # The solvers print their number of words
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver = ws.WordleSolver(word_length, 6)
+        solvers = {'bitset': ws.WordleSolver(word_length, 6, words=solver.word_buffer, engine='bitset')}
+        if np is not None:
+            solvers['numpy'] = ws.WordleSolver(word_length, 6, words=solver.word_buffer, engine='numpy')
+    answers = solver.word_list[::max(len(solver.word_list) // num_answers, 1)][:num_answers]
+    games = [list(play_turns(solver, answer)) for answer in answers]
+    # Turn number -> case -> list of per-game measurements. The freq table of the remaining words is either rebuilt
+    # from them, as solve used to do every turn, or updated with update_letter_position_freq_table
+    turns = {}
+    for game in games:
+        for turn, (possible_words, attempt, response, remaining_words) in enumerate(game):
+            freq_table = ws.create_letter_position_freq_table(possible_words, word_length)
+            eliminated_words = list(set(possible_words).difference(remaining_words))
+            cases = turns.setdefault(turn + 1, {'words': [], 'left': [], 'rebuild': [], 'update': [], 'set': []})
+            cases['words'].append(len(possible_words))
+            cases['left'].append(len(remaining_words))
+            cases['rebuild'].append(best_time(
+                lambda: ws.create_letter_position_freq_table(remaining_words, word_length), repeat))
+            cases['update'].append(best_time(
+                lambda: ws.update_letter_position_freq_table([row[:] for row in freq_table], remaining_words,
+                                                             eliminated_words), repeat))
+            cases['set'].append(best_time(
+                lambda: solver.parse_response_and_filter(possible_words, attempt, response), repeat))
+            indices = sorted(solver.word_ids[word] for word in possible_words)
+            if 'numpy' in solvers:
+                numpy_indices = np.array(indices, dtype=np.intp)
+                cases.setdefault('numpy', []).append(best_time(
+                    lambda: solvers['numpy'].parse_response_and_filter_indices(numpy_indices, attempt, response),
+                    repeat))
+            bits = solvers['bitset'].word_bitsets.from_ids(indices)
+            cases.setdefault('bitset', []).append(best_time(
+                lambda: solvers['bitset'].parse_response_and_filter_bits(bits, attempt, response), repeat))
+    filters = [engine for engine in ('set', 'numpy', 'bitset') if engine == 'set' or engine in solvers]
+    print('{} answers, mean milliseconds per turn'.format(len(answers)))
+    print('{:<5} {:>6} {:>7} {:>7} {:>9} {:>9}'.format('turn', 'games', 'words', 'left', 'rebuild', 'update') +
+          ''.join(' {:>9}'.format(engine) for engine in filters))
+    for turn in sorted(turns):
+        cases = turns[turn]
+        print('{:<5} {:>6} {:>7.0f} {:>7.0f} {:>9.3f} {:>9.3f}'.format(
+            turn, len(cases['words']), mean(cases['words']), mean(cases['left']), mean(cases['rebuild']) * 1000,
+            mean(cases['update']) * 1000) + ''.join(' {:>9.3f}'.format(mean(cases[engine]) * 1000)
+                                                    for engine in filters))
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    run_turn_benchmarks(args.word_length, args.answers, args.repeat)
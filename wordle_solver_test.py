@@ -1,9 +1,26 @@
 import heapq
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+import twl
 import wordle_solver as ws
 
+try:
+    import word_matrix
+except ImportError:
+    word_matrix = None
+
+# (attempt, response) pairs the filters are checked on. In the last two a repeated letter is marked both found and not
+# contained, where parse_response_and_filter keeps more words than Wordle's duplicate-letter rule allows
+FILTER_CASES = [('OPERA', 'XXXXX'), ('OPERA', 'OOOOO'), ('OPERA', 'OOOXX'), ('OPERA', 'OOO??'), ('HILLY', '?O?XX'),
+                ('DIGIT', 'XOOXO'), ('LLAMA', '??XXX'), ('LLAMA', 'XX?XX'), ('EERIE', '?XOXO')]
+# Answers the engines are compared on, attempt by attempt
+SOLVE_ANSWERS = ['OPENS', 'LIGHT', 'JAZZY', 'LLAMA', 'EERIE']
+
 
 class TestWordleSolverMethods(unittest.TestCase):
     def setUp(self) -> None:
@@ -21,6 +38,18 @@ class TestWordleSolverMethods(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.wordle.make_attempt("four")
 
+    def test_make_attempt_with_input(self):
+        with patch('builtins.input', return_value='point'):
+            self.wordle.make_attempt_with_input()
+        self.assertEqual('POINT', self.wordle.attempts[-1])
+        with patch('builtins.input', return_value='PXINT'):
+            with self.assertRaises(ValueError):
+                self.wordle.make_attempt_with_input()
+        with patch('builtins.input', return_value='POINE'):
+            with self.assertRaises(ValueError):
+                self.wordle.make_attempt_with_input()
+        self.assertEqual(1, len(self.wordle.attempts))
+
     def test_get_automated_attempt_response(self):
         self.wordle.make_attempt("HILLY")
         self.wordle.get_automated_attempt_response("LIGHT")
@@ -55,15 +84,51 @@ class TestWordleSolverMethods(unittest.TestCase):
         self.assertEqual(freq_dict['S4'], 2785)
         with self.assertRaises(KeyError):
             test_freq = freq_dict['S5']
+        self.assertEqual(ws.create_letter_position_freq_dict(['hello', 'world']),
+                         {'h0': 1, 'e1': 1, 'l2': 1, 'l3': 2, 'o4': 1, 'w0': 1, 'o1': 1, 'r2': 1, 'd4': 1})
+        self.assertEqual(ws.create_letter_position_freq_dict(['OPERA', 'OPEN']),
+                         {'O0': 2, 'P1': 2, 'E2': 2, 'R3': 1, 'A4': 1, 'N3': 1})
+
+    def test_solver_create_letter_position_freq_table(self):
+        freq_table = ws.create_letter_position_freq_table(self.wordle_solver.filtered_words_by_length, 5)
+        self.assertEqual(len(freq_table), 5)
+        self.assertEqual(freq_table[2][ord('E') - ord('A')], 580)
+        self.assertEqual(freq_table[4][ord('S') - ord('A')], 2785)
+        self.assertEqual(sum(freq_table[0]), 8938)
+        self.assertEqual(ws.freq_table_to_dict(freq_table), self.initial_freq_dict)
+        self.assertEqual(ws.freq_dict_to_table(self.initial_freq_dict, 5), freq_table)
+        self.assertEqual(ws.freq_dict_to_table(dict(self.initial_freq_dict, S5=9, a0=9, **{'$0': 9}), 5), freq_table)
+        self.assertEqual(ws.create_letter_position_freq_table([], 5), [[0] * 26] * 5)
+        self.assertEqual(ws.create_letter_position_freq_table(['sores'], 5),
+                         ws.create_letter_position_freq_table(['SORES'], 5))
+        self.assertEqual(self.wordle_solver.create_word_freq_score_heap(freq_table)[0], (-7824, 'SORES'))
 
     def test_solver_create_word_freq_score_heap(self):
         freq_score_heap = self.wordle_solver.create_word_freq_score_heap(self.initial_freq_dict)
         self.assertEqual(len(freq_score_heap), 8938)
         self.assertEqual(heapq.heappop(freq_score_heap), (-7824, 'SORES'))
         self.assertEqual(heapq.heappop(freq_score_heap), (-7807, 'SANES'))
+        # Keys no 5-letter uppercase word has, 'T5', lowercase or '$0', score nothing, as with the dict lookups:
+        # SORES gets S0 from SOREST only and 2 for each other letter
+        freq_dict = ws.create_letter_position_freq_dict(['SOREST', 'sores', '$ORES'])
+        self.assertEqual(self.wordle_solver.get_freq_scores(freq_dict)[self.wordle_solver.word_ids['SORES']], 9)
         freq_score_heap = self.wordle_solver.create_word_freq_score_heap({})
         self.assertEqual(len(freq_score_heap), 8938)
 
+    def test_solver_top_guesses(self):
+        self.assertEqual(self.wordle_solver.top_guesses(3), ['SORES', 'SANES', 'SALES'])
+        self.assertEqual(self.wordle_solver.top_guesses(1, self.initial_freq_dict), ['SORES'])
+        solver = ws.WordleSolver(3, 6, words=b'CABCATCOB')
+        # CAT and COB both score 6, CAT comes first alphabetically
+        self.assertEqual(solver.get_freq_scores(ws.create_letter_position_freq_table(solver.word_list, 3)), [7, 6, 6])
+        self.assertEqual(solver.top_guesses(2), ['CAB', 'CAT'])
+        self.assertEqual(solver.top_guesses(5), ['CAB', 'CAT', 'COB'])
+        guesses = solver.iter_guesses()
+        self.assertEqual(next(guesses), 'CAB')
+        self.assertEqual(list(guesses), ['CAT', 'COB'])
+        self.assertEqual(list(self.wordle_solver.iter_guesses(self.initial_freq_dict))[:3],
+                         self.wordle_solver.top_guesses(3))
+
     def test_solver_get_best_freq_score_word(self):
         best_freq_score_word = self.wordle_solver.get_best_freq_score_word(self.initial_freq_dict)
         self.assertEqual(best_freq_score_word, 'SORES')
@@ -116,3 +181,171 @@ class TestWordleSolverMethods(unittest.TestCase):
         self.assertTrue('LIGHT' in filtered_words)
         # Need to clean up state side effects
         self.wordle_solver = ws.WordleSolver(5, 6)
+
+    # The words for which Wordle gives response to attempt, what every filter should return
+    def get_consistent_words(self, attempt, response) -> set:
+        return {word for word in self.wordle_solver.word_list if ws.create_attempt_response(attempt, word) == response}
+
+    # The attempts solver makes to find answer, within the attempts allowed
+    def get_solve_attempts(self, solver, answer) -> list:
+        attempts = []
+        make_attempt = ws.Wordle.make_attempt
+
+        def record_attempt(wordle, attempt_word):
+            attempts.append(attempt_word)
+            make_attempt(wordle, attempt_word)
+        with patch.object(ws.Wordle, 'make_attempt', record_attempt):
+            solver.solve(answer)
+        return attempts
+
+    def test_create_attempt_response(self):
+        self.assertEqual(ws.create_attempt_response('HILLY', 'LIGHT'), '?O?XX')
+        self.assertEqual(ws.create_attempt_response('LLAMA', 'HELLO'), '??XXX')
+        self.assertEqual(ws.create_attempt_response('OPERA', 'OPERA'), 'OOOOO')
+
+    def test_solver_search_possible_words(self):
+        for attempt, response in FILTER_CASES:
+            consistent_words = self.get_consistent_words(attempt, response)
+            self.assertEqual(self.wordle_solver.search_possible_words([attempt], [response]), consistent_words)
+            self.assertLessEqual(consistent_words, self.wordle_solver.parse_response_and_filter(
+                self.wordle_solver.filtered_words_by_length, attempt, response))
+        possible_words = self.wordle_solver.search_possible_words(['HILLY', 'DIGIT'], ['?O?XX', 'XOOXO'])
+        self.assertEqual(possible_words, {'LIGHT'})
+        solver = ws.WordleSolver(3, 6, words=b'CABCATCOB')
+        self.assertEqual(solver.search_possible_words(['CAB'], ['OXX']), set())
+        self.assertEqual(solver.search_possible_words(['CAB'], ['OOX']), {'CAT'})
+
+    def test_solvers_share_word_buffers(self):
+        buffers = twl.words_by_length([4, 5])
+        self.assertEqual(ws.split_word_buffer(buffers[4][:8], 4), ['AAHS', 'AALS'])
+        solver = ws.WordleSolver(5, 6, words=buffers[5])
+        self.assertEqual(solver.filtered_words_by_length, self.wordle_solver.filtered_words_by_length)
+        self.assertEqual(len(ws.WordleSolver(4, 6, words=buffers[4]).filtered_words_by_length), 4030)
+
+    def test_solver_uses_word_pack(self):
+        with tempfile.TemporaryDirectory() as pack_dir:
+            solver = ws.WordleSolver(5, 6, pack_dir=pack_dir)
+            self.assertEqual(len(os.listdir(pack_dir)), 1)
+            self.assertEqual(solver.filtered_words_by_length, self.wordle_solver.filtered_words_by_length)
+            with patch('twl.words_by_length', side_effect=AssertionError('dictionary walked')):
+                solver = ws.WordleSolver(5, 6, pack_dir=pack_dir)
+            self.assertEqual(solver.filtered_words_by_length, self.wordle_solver.filtered_words_by_length)
+
+    @unittest.skipIf(word_matrix is None, 'NumPy is not installed')
+    def test_solver_parse_response_and_filter_indices(self):
+        solver = ws.WordleSolver(5, 6, engine='numpy')
+        self.assertEqual(solver.word_matrix.shape, (len(solver.word_list), 5))
+        for attempt, response in FILTER_CASES:
+            indices = solver.parse_response_and_filter_indices(None, attempt, response)
+            self.assertEqual({solver.word_list[i] for i in indices}, self.get_consistent_words(attempt, response))
+        indices = solver.parse_response_and_filter_indices(None, 'HILLY', '?O?XX')
+        indices = solver.parse_response_and_filter_indices(indices, 'DIGIT', 'XOOXO')
+        self.assertEqual([solver.word_list[i] for i in indices], ['LIGHT'])
+        for answer in SOLVE_ANSWERS:
+            self.assertEqual(self.get_solve_attempts(solver, answer),
+                             self.get_solve_attempts(self.wordle_solver, answer))
+
+    @unittest.skipIf(word_matrix is None, 'NumPy is not installed')
+    def test_solver_pattern_matrix_cache(self):
+        words = b'HILLYLIGHTNIGHTOPERAOPENS'
+        with tempfile.TemporaryDirectory() as pack_dir:
+            solver = ws.WordleSolver(5, 6, words=words, pack_dir=pack_dir)
+            patterns = solver.get_pattern_matrix()
+            self.assertEqual(patterns.shape, (5, 5))
+            self.assertEqual(len(os.listdir(pack_dir)), 1)
+            self.assertEqual(word_matrix.pattern_response(patterns[0, 1], 5), '?O?XX')
+            solver = ws.WordleSolver(5, 6, words=words, pack_dir=pack_dir)
+            with patch('word_matrix.create_pattern_matrix', side_effect=AssertionError('patterns computed')):
+                self.assertEqual(solver.get_pattern_matrix().tolist(), patterns.tolist())
+            self.assertIs(solver.get_pattern_matrix(), solver.pattern_matrix)
+            del solver, patterns
+
+    @unittest.skipIf(word_matrix is None, 'NumPy is not installed')
+    def test_solver_pattern_matrix_cache_from_word_pack(self):
+        # The first solver walks the dictionary, the second reads the word pack the first one wrote
+        with tempfile.TemporaryDirectory() as pack_dir:
+            solver = ws.WordleSolver(3, 6, pack_dir=pack_dir)
+            patterns = solver.get_pattern_matrix()
+            solver = ws.WordleSolver(3, 6, pack_dir=pack_dir)
+            with patch('word_matrix.create_pattern_matrix', side_effect=AssertionError('patterns computed')):
+                self.assertEqual(solver.get_pattern_matrix().tolist(), patterns.tolist())
+            self.assertEqual(len([name for name in os.listdir(pack_dir) if name.endswith('.npy')]), 1)
+            del solver, patterns
+
+    @unittest.skipIf(word_matrix is None, 'NumPy is not installed')
+    def test_solver_partition_strategies(self):
+        words = b'FIGHTHILLYLIGHTMIGHTNIGHTOPENSOPERASIGHT'
+        solver = ws.WordleSolver(5, 6, words=words)
+        # NIGHT, OPENS and SIGHT all split the words four ways, NIGHT comes first
+        self.assertEqual(solver.get_best_partition_word(), 'NIGHT')
+        # Ties between possible words (LIGHT, MIGHT, NIGHT) and other words go to a possible word
+        self.assertEqual(solver.get_best_partition_word([2, 3, 4]), 'LIGHT')
+        self.assertEqual(solver.get_best_partition_word([5]), 'OPENS')
+        # Every word but OPERA leaves at most 4 words, FIGHT comes first
+        self.assertEqual(solver.get_best_partition_word(strategy='minimax'), 'FIGHT')
+        self.assertEqual(solver.get_best_partition_word(strategy='expected_size'), 'NIGHT')
+        statistics = solver.get_partition_statistics()
+        self.assertIs(solver.get_partition_statistics(), statistics)
+        self.assertEqual(statistics['max_size'].tolist(), [4, 4, 4, 4, 4, 4, 6, 4])
+        self.assertEqual(statistics['expected_size'][4], 2.5)
+        for engine in ('set', 'numpy'):
+            solver = ws.WordleSolver(5, 6, words=words, engine=engine)
+            for answer in solver.word_list:
+                for strategy in ws.PARTITION_STRATEGY_SCORES:
+                    self.assertTrue(solver.solve(answer, strategy=strategy))
+        with self.assertRaises(ValueError):
+            solver.solve('LIGHT', strategy='luck')
+
+    def test_solver_imports_numpy_lazily(self):
+        code = ('import sys, wordle_solver; wordle_solver.WordleSolver(3, 6, engine="bitset"); '
+                'print("numpy" in sys.modules)')
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        self.assertEqual(output.splitlines()[-1], 'False')
+
+    def test_solver_parse_response_and_filter_bits(self):
+        solver = ws.WordleSolver(5, 6, engine='bitset')
+        for attempt, response in FILTER_CASES:
+            bits = solver.parse_response_and_filter_bits(solver.word_bitsets.all_words(), attempt, response)
+            self.assertEqual(set(solver.word_bitsets.words(bits)), self.get_consistent_words(attempt, response))
+        bits = solver.parse_response_and_filter_bits(solver.word_bitsets.all_words(), 'HILLY', '?O?XX')
+        bits = solver.parse_response_and_filter_bits(bits, 'DIGIT', 'XOOXO')
+        self.assertEqual(solver.word_bitsets.words(bits), ['LIGHT'])
+        for answer in SOLVE_ANSWERS:
+            self.assertEqual(self.get_solve_attempts(solver, answer),
+                             self.get_solve_attempts(self.wordle_solver, answer))
+
+    def test_update_letter_position_freq_table(self):
+        words = self.wordle_solver.filtered_words_by_length
+        freq_table = ws.create_letter_position_freq_table(words, 5)
+        # Few words eliminated, subtracted from the table
+        remaining_words, eliminated_words = self.wordle_solver.parse_response_and_split(words, 'WHIZZ', 'XXXXX')
+        self.assertEqual(remaining_words, self.wordle_solver.parse_response_and_filter(words, 'WHIZZ', 'XXXXX'))
+        self.assertEqual(remaining_words | set(eliminated_words), words)
+        self.assertGreater(len(remaining_words), len(words) / 2)
+        freq_table = ws.update_letter_position_freq_table(freq_table, remaining_words, eliminated_words)
+        self.assertEqual(freq_table, ws.create_letter_position_freq_table(remaining_words, 5))
+        # Most words eliminated, rebuilt from the remaining ones
+        words = remaining_words
+        remaining_words, eliminated_words = self.wordle_solver.parse_response_and_split(words, 'OPERA', 'XX?X?')
+        self.assertLess(len(remaining_words), len(words) / 2)
+        freq_table = ws.update_letter_position_freq_table(freq_table, remaining_words, eliminated_words)
+        self.assertEqual(freq_table, ws.create_letter_position_freq_table(remaining_words, 5))
+        self.assertEqual(ws.update_letter_position_freq_table(freq_table, set(), remaining_words), [[0] * 26] * 5)
+
+    @unittest.skipIf(word_matrix is None, 'NumPy is not installed')
+    def test_solver_score_words(self):
+        solver = ws.WordleSolver(5, 6, engine='numpy')
+        scores = solver.score_words()
+        self.assertEqual(scores.tolist(), self.wordle_solver.get_freq_scores(self.initial_freq_dict))
+        top = word_matrix.top_indices(scores, 3)
+        self.assertEqual([solver.word_list[i] for i in top], self.wordle_solver.top_guesses(3))
+        possible_indices = solver.parse_response_and_filter_indices(None, 'OPERA', 'XX?XX')
+        possible_words = [solver.word_list[i] for i in possible_indices]
+        freq_table = ws.create_letter_position_freq_table(possible_words, 5)
+        self.assertEqual(solver.score_words(possible_indices).tolist(), solver.get_freq_scores(freq_table))
+        top = word_matrix.top_indices(solver.score_words(weighting='position_presence'), 1)
+        self.assertEqual(solver.word_list[top[0]], 'TARES')
+        bitset_solver = ws.WordleSolver(5, 6, engine='bitset')
+        for answer in SOLVE_ANSWERS:
+            self.assertEqual(self.get_solve_attempts(solver, answer), self.get_solve_attempts(bitset_solver, answer))